@@ -0,0 +1,115 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from cmu_graphics import CMUImage
+
+# Decoded image cache for the UI. Every file under images/ is read into memory once by a
+# background thread at startup, and images are handed out already scaled to the size they
+# are drawn at, so redraws never touch the filesystem or rescale. Scaled variants are kept
+# in an LRU of bounded size; the compressed file bytes (a few MB) are kept for the session.
+
+class AssetCache:
+    def __init__(self, root='images', maxVariants=128):
+        self.root = root
+        self.maxVariants = maxVariants
+        self.lock = threading.Lock()
+        self.files = {}                 # path -> compressed file bytes
+        self.variants = OrderedDict()   # (path, width, height) -> (PIL image, CMUImage or None)
+        self.loaded = threading.Event()
+        self.thread = None
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def start(self, variants=()):
+        """
+        Read every file under root in the background, then prepare the given
+        (path, width, height) variants so the first redraws find them ready.
+        """
+        self.thread = threading.Thread(target=self.run, args=(list(variants),), daemon=True)
+        self.thread.start()
+
+    def run(self, variants):
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.lower().endswith('.png'):
+                    path = os.path.join(directory, name).replace(os.sep, '/')
+                    with open(path, 'rb') as f:
+                        files[path] = f.read()
+        with self.lock:
+            self.files.update(files)
+        self.loaded.set()
+
+        for path, width, height in variants:
+            try:
+                self.image(path, width, height)
+            except (KeyError, OSError) as e:
+                print(f"Could not prepare {path}: {e}")
+
+    def fileBytes(self, path):
+        self.loaded.wait()
+        with self.lock:
+            return self.files[path]
+
+    def paths(self, directory):
+        # Sorted paths of the cached files directly inside directory
+        self.loaded.wait()
+        prefix = directory.rstrip('/') + '/'
+        with self.lock:
+            return sorted(path for path in self.files if path.startswith(prefix) and '/' not in path[len(prefix):])
+
+    def pilImage(self, path, width, height):
+        """
+        The image at path scaled to width x height, as an RGBA PIL image. Do not modify it.
+        """
+        return self.variant(path, width, height)[0]
+
+    def image(self, path, width, height):
+        """
+        The image at path scaled to width x height, ready for drawImage without a size.
+        """
+        key = (path, int(width), int(height))
+        pil, image = self.variant(path, width, height)
+        if image is None:
+            image = CMUImage(pil)
+            with self.lock:
+                if key in self.variants:
+                    self.variants[key] = (pil, image)
+        return image
+
+    def variant(self, path, width, height):
+        key = (path, int(width), int(height))
+        with self.lock:
+            entry = self.variants.get(key)
+            if entry is not None:
+                self.variants.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Decode outside the lock; a concurrent miss for the same key just does the work twice
+        with Image.open(io.BytesIO(self.fileBytes(path))) as source:
+            pil = source.convert('RGBA').resize((key[1], key[2]), Image.LANCZOS)
+
+        with self.lock:
+            entry = self.variants.setdefault(key, (pil, None))
+            self.variants.move_to_end(key)
+            while len(self.variants) > self.maxVariants:
+                self.variants.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def stats(self):
+        with self.lock:
+            return {
+                'files': len(self.files),
+                'variants': len(self.variants),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
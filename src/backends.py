@@ -0,0 +1,272 @@
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+# Inference backends for the detector. The PyTorch weights are exported once to ONNX (and
+# OpenVINO IR when available), the exported artifact is cached next to the weights, and the
+# fastest installed backend whose detections match PyTorch's on a few frames of the bundled
+# test video is picked at startup. The choice is cached next to the weights too. ultralytics (and torch) are only
+# imported once a model is actually loaded, to keep app startup fast.
+#
+# Benchmark every backend against the PyTorch reference (from the repository root):
+#   python src/backends.py --video tests/test1.mp4
+
+BACKENDS = ('openvino', 'onnx', 'torch')
+QUANTIZED_BACKENDS = ('int8-dynamic', 'int8-static')  # Opt-in only, never auto-selected
+
+# Backend picked by selectBackend, shared by every detector loaded in this process
+selectedBackend = None
+
+# Exported backends must reproduce PyTorch's detections on frames of this video to be selected
+validationVideo = 'tests/test1.mp4'
+validationFrameCount = 8
+
+# A loaded model plus the device it must be called with
+class Detector:
+    def __init__(self, model, backend, device):
+        self.model = model
+        self.backend = backend
+        self.device = device
+
+    def __call__(self, frames, **kwargs):
+        return self.model(frames, device=self.device, **kwargs)
+
+def torchDevice():
+    # Best device for eager PyTorch: Apple GPU, then CUDA, then CPU
+    import torch
+    if torch.backends.mps.is_available():
+        return 'mps'
+    if torch.cuda.is_available():
+        return 0
+    return 'cpu'
+
+def isAvailable(backend):
+    if backend == 'torch':
+        return True
+    if backend == 'onnx':
+        return importlib.util.find_spec('onnxruntime') is not None
+    if backend == 'openvino':
+        return importlib.util.find_spec('openvino') is not None
+    return False
+
+def exportedPath(weights, backend):
+    # Where the exported artifact for these weights is cached. Exports take any batch size,
+    # and are named apart from older single-image exports so those are never picked up.
+    stem, _ = os.path.splitext(weights)
+    if backend == 'onnx':
+        return stem + '_dynamic.onnx'
+    if backend == 'openvino':
+        return stem + '_dynamic_openvino_model'
+    return weights
+
+def exportModel(weights, backend):
+    """
+    Export the weights for a backend, reusing the cached artifact unless the weights are newer.
+    Returns the artifact path. The export is written to a temporary directory and renamed into
+    place, so processes exporting at the same time never see or leave a partial artifact.
+    """
+    path = exportedPath(weights, backend)
+    if backend == 'torch':
+        return path
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(weights):
+        return path
+
+    from ultralytics import YOLO
+    print(f"Exporting {weights} for {backend}...")
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(weights))) as tempDir:
+        tempWeights = os.path.join(tempDir, os.path.basename(weights))
+        shutil.copy2(weights, tempWeights)
+        # Dynamic axes, since the batching detector and runInferenceBatch send several frames per call
+        exported = YOLO(tempWeights).export(format=backend, dynamic=True)
+        if os.path.isdir(path):
+            # A stale OpenVINO directory can't be replaced in one rename
+            shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(exported, path)
+        except OSError:
+            # Another process renamed its export into place first
+            if not os.path.exists(path):
+                raise
+    return path
+
+def loadBackend(weights, backend):
+    """
+    Load a Detector for one backend, exporting the weights first if needed. The opt-in
+    quantized detectors are named 'int8-dynamic' and 'int8-static' (see quantization.py).
+    """
+    from ultralytics import YOLO
+
+    if backend.startswith('int8-'):
+        from quantization import loadQuantized
+        return loadQuantized(weights, backend[len('int8-'):])
+    if backend == 'torch':
+        return Detector(YOLO(weights), backend, torchDevice())
+    return Detector(YOLO(exportModel(weights, backend), task='detect'), backend, 'cpu')
+
+def measureLatency(detector, frames, warmup=2, runs=10):
+    # Mean single-frame latency in milliseconds after a few warm-up calls
+    for i in range(warmup):
+        detector(frames[i % len(frames)], verbose=False)
+    start = time.perf_counter()
+    for i in range(runs):
+        detector(frames[i % len(frames)], verbose=False)
+    return (time.perf_counter() - start) / runs * 1000
+
+def selectBackend(weights, candidates=BACKENDS, frameSize=(265, 540), validationFrames=None,
+                  minMatchRate=0.95, minIou=0.9):
+    """
+    Time every available backend on a dummy frame and remember the fastest one. Backends other
+    than PyTorch are only considered if their detections match PyTorch's on the validation
+    frames (sampled from validationVideo unless given); without any frames to check, PyTorch
+    is used. Falls back to PyTorch if an export or load fails. The result is cached next to
+    the weights and reused until the weights or the installed backends change.
+    """
+    global selectedBackend
+    if selectedBackend is not None:
+        return selectedBackend
+
+    available = [backend for backend in candidates if isAvailable(backend)]
+    selectionKey = {'weightsMtime': os.path.getmtime(weights) if os.path.exists(weights) else None,
+                    'available': available, 'minMatchRate': minMatchRate, 'minIou': minIou}
+    selectedBackend = readSelection(weights, selectionKey)
+    if selectedBackend is not None:
+        return selectedBackend
+
+    if validationFrames is None and available != ['torch']:
+        validationFrames = sampleFrames(validationVideo, validationFrameCount) if os.path.exists(validationVideo) else []
+
+    dummy = [np.zeros((frameSize[0], frameSize[1], 3), dtype=np.uint8)]
+    reference = None
+    latencies = {}
+    for backend in available:
+        try:
+            if backend != 'torch' and not validationFrames:
+                print(f"Backend {backend} skipped: no validation frames to check it against PyTorch")
+                continue
+            detector = loadBackend(weights, backend)
+            if backend != 'torch':
+                reference = reference if reference is not None else loadBackend(weights, 'torch')
+                matchRate = compareDetectors(reference, detector, validationFrames, minIou)
+                if matchRate < minMatchRate:
+                    print(f"Backend {backend} skipped: only {matchRate * 100:.0f}% of frames match PyTorch")
+                    continue
+            latencies[backend] = measureLatency(detector, dummy, runs=3)
+        except Exception as e:
+            print(f"Backend {backend} unavailable: {e}")
+
+    selectedBackend = min(latencies, key=latencies.get) if latencies else 'torch'
+    if validationFrames or available == ['torch']:
+        # Not cached when nothing could be validated, so a later run can check again
+        writeSelection(weights, selectionKey, selectedBackend)
+    return selectedBackend
+
+def selectionPath(weights):
+    stem, _ = os.path.splitext(weights)
+    return stem + '.backend.json'
+
+def readSelection(weights, selectionKey):
+    # Backend cached by an earlier selectBackend with the same weights and backends, or None
+    try:
+        with open(selectionPath(weights)) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('key') != selectionKey or cached.get('backend') not in selectionKey['available']:
+        return None
+    return cached['backend']
+
+def writeSelection(weights, selectionKey, backend):
+    try:
+        with open(selectionPath(weights), 'w') as f:
+            json.dump({'key': selectionKey, 'backend': backend}, f)
+    except OSError as e:
+        print(f"Could not cache the backend selection: {e}")
+
+def boxIou(a, b):
+    # Intersection over union of two (x1, y1, x2, y2) boxes
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+def detectionsMatch(reference, candidate, minIou=0.9):
+    """
+    True if both detection arrays hold the same classes and every reference box has a
+    same-class candidate box overlapping it by at least minIou.
+    """
+    if len(reference) != len(candidate):
+        return False
+    unmatched = list(range(len(candidate)))
+    for cls, box in zip(reference['cls'].tolist(), reference['box'].tolist()):
+        sameClass = [i for i in unmatched if candidate['cls'][i] == cls]
+        best = max(sameClass, key=lambda i: boxIou(box, candidate['box'][i]), default=None)
+        if best is None or boxIou(box, candidate['box'][best]) < minIou:
+            return False
+        unmatched.remove(best)
+    return True
+
+def sampleFrames(path, count, outputWidth=540, outputHeight=265):
+    # Evenly spaced frames from a video, as the model inputs the live pipeline builds
+    import cv2
+    from preprocessing import Preprocessor
+
+    preprocessor = Preprocessor(outputWidth, outputHeight)
+    cam = cv2.VideoCapture(path)
+    frameCount = int(cam.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for i in range(count):
+        cam.set(cv2.CAP_PROP_POS_FRAMES, frameCount * i // count)
+        ret, frame = cam.read()
+        if ret:
+            frames.append(preprocessor.letterbox(preprocessor.crop(frame))[0].copy())
+    cam.release()
+    return frames
+
+def compareDetectors(reference, detector, frames, minIou=0.9):
+    # Fraction of frames on which the detector's output matches the reference's
+    from objectDetection import runInference
+
+    if not frames:
+        return 1.0
+    matches = sum(detectionsMatch(runInference(frame, reference), runInference(frame, detector), minIou)
+                  for frame in frames)
+    return matches / len(frames)
+
+def benchmark(weights, frames, minIou=0.9):
+    """
+    Report per-backend latency and how often each backend's detections match PyTorch's.
+    """
+    reference = loadBackend(weights, 'torch')
+
+    report = {}
+    for backend in BACKENDS:
+        if not isAvailable(backend):
+            continue
+        detector = reference if backend == 'torch' else loadBackend(weights, backend)
+        report[backend] = {
+            'latencyMs': measureLatency(detector, frames),
+            'matchRate': compareDetectors(reference, detector, frames, minIou),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detector backends against PyTorch.")
+    parser.add_argument('--weights', default='v11.pt')
+    parser.add_argument('--video', default='tests/test1.mp4', help="video to sample frames from")
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--min-iou', type=float, default=0.9, help="box overlap needed to count as a match")
+    args = parser.parse_args()
+
+    report = benchmark(args.weights, sampleFrames(args.video, args.frames), args.min_iou)
+    for backend, result in report.items():
+        print(f"{backend:>8}: {result['latencyMs']:.1f} ms/frame, "
+              f"{result['matchRate'] * 100:.0f}% of frames match PyTorch")
+
+if __name__ == "__main__":
+    main()
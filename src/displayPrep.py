@@ -0,0 +1,102 @@
+import threading
+import time
+from overlay import renderOverlay
+
+# Double-buffered preparation of live-view frames. The UI step hands over the newest detection
+# result (the back buffer) and a worker thread draws its overlay and converts it into a
+# draw-ready image (the front buffer). The UI then swaps the front image into app.frameImage
+# with a single reference assignment, so redraws always have a complete frame and never wait
+# on conversion. A result that is replaced before the worker picks it up is never converted.
+
+class DisplayPreparer:
+    def __init__(self, convert):
+        self.convert = convert              # BGR frame -> image that drawImage accepts
+        self.condition = threading.Condition()
+        self.pending = None                 # Back buffer: (result, annotation style) waiting to be prepared
+        self.ready = None                   # Front buffer: newest prepared image
+        self.readyVersion = 0
+        self.takenVersion = 0
+        self.generation = 0                 # Bumped by clear() so in-flight frames are discarded
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+        # Stats
+        self.prepared = 0
+        self.replaced = 0
+        self.prepSeconds = 0.0
+        self.startTime = None
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, result, style='full'):
+        # Queue a result for preparation, replacing any result the worker has not started yet
+        with self.condition:
+            if self.pending is not None:
+                self.replaced += 1
+            self.pending = (result, style)
+            self.condition.notify()
+
+    def swap(self):
+        """
+        Newest prepared image if it has not been taken yet, otherwise None. Never blocks on
+        the worker beyond a brief lock.
+        """
+        with self.condition:
+            if self.readyVersion == self.takenVersion:
+                return None
+            self.takenVersion = self.readyVersion
+            return self.ready
+
+    def clear(self):
+        # Drop pending and prepared frames, e.g. when the live view ends
+        with self.condition:
+            self.pending = None
+            self.ready = None
+            self.takenVersion = self.readyVersion
+            self.generation += 1
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                result, style = self.pending
+                self.pending = None
+                generation = self.generation
+
+            start = time.perf_counter()
+            try:
+                image = self.convert(renderOverlay(result, style))
+            except Exception as e:
+                # Keep showing the previous frame
+                print(f"Display preparation failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+
+            with self.condition:
+                if generation != self.generation:
+                    continue
+                self.ready = image
+                self.readyVersion += 1
+                self.prepared += 1
+                self.prepSeconds += elapsed
+                if self.startTime is None:
+                    self.startTime = time.time()
+
+    def stats(self):
+        with self.condition:
+            elapsed = time.time() - self.startTime if self.startTime is not None else 0
+            return {
+                'prepared': self.prepared,
+                'replaced': self.replaced,
+                'fps': self.prepared / elapsed if elapsed > 0 else 0,
+                'meanPrepMs': self.prepSeconds / self.prepared * 1000 if self.prepared else 0,
+            }
@@ -0,0 +1,47 @@
+# Fenwick (binary indexed) tree of integer counts, e.g. one made flag per shot. Prefix and
+# range sums, point updates and appends are all O(log n), so the shot history can answer
+# makes over any range of shots and correct a past shot without recomputing running totals.
+
+class FenwickTree:
+    def __init__(self, values=()):
+        # tree[i] (1-based) holds the sum of values over (i - lowbit(i), i]
+        self.values = [int(v) for v in values]
+        self.tree = [0] + self.values
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        # The new node covers (i - lowbit(i), i]: the new value plus the tail of the old values
+        i = len(self.values) + 1
+        self.values.append(int(value))
+        self.tree.append(int(value) + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def add(self, index, delta):
+        self.values[index] += delta
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def set(self, index, value):
+        self.add(index, int(value) - self.values[index])
+
+    def prefix(self, end):
+        # Sum of values[:end]
+        total = 0
+        i = min(end, len(self.values))
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def sum(self, start, end):
+        # Sum of values[start:end]
+        if end <= start:
+            return 0
+        return self.prefix(end) - self.prefix(start)
@@ -0,0 +1,120 @@
+import threading
+
+# Overflow policies for a full channel
+DROP_OLDEST = 'drop-oldest'    # Overwrite the oldest queued item (latest frame wins)
+DROP_NEWEST = 'drop-newest'    # Discard the incoming item and keep what is queued
+BLOCK = 'block'                # Make the producer wait until the consumer frees a slot
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Bounded ring buffer shared by the detection thread (producer) and the UI step (consumer)
+class FrameChannel:
+    def __init__(self, capacity=4, policy=DROP_OLDEST):
+        if capacity < 1:
+            raise ValueError("FrameChannel capacity must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}', expected one of {POLICIES}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.slots = [None] * capacity  # Fixed storage, never reallocated
+        self.head = 0                   # Index of the oldest item
+        self.count = 0                  # Number of items currently queued
+        self.closed = False
+        self.condition = threading.Condition()
+
+        # Counters for checking behaviour under load
+        self.putCount = 0
+        self.getCount = 0
+        self.droppedOldest = 0
+        self.droppedNewest = 0
+        self.maxDepth = 0
+
+    def put(self, item, timeout=None):
+        # Enqueue an item, applying the overflow policy if the buffer is full.
+        # Returns False if the item was discarded or the channel was closed.
+        with self.condition:
+            if self.closed:
+                return False
+
+            if self.count == self.capacity:
+                if self.policy == DROP_NEWEST:
+                    self.droppedNewest += 1
+                    return False
+                elif self.policy == DROP_OLDEST:
+                    self.slots[self.head] = None
+                    self.head = (self.head + 1) % self.capacity
+                    self.count -= 1
+                    self.droppedOldest += 1
+                else:
+                    if not self.condition.wait_for(lambda: self.count < self.capacity or self.closed, timeout):
+                        return False
+                    if self.closed:
+                        return False
+
+            tail = (self.head + self.count) % self.capacity
+            self.slots[tail] = item
+            self.count += 1
+            self.putCount += 1
+            self.maxDepth = max(self.maxDepth, self.count)
+            self.condition.notify_all()
+            return True
+
+    def get(self, block=False, timeout=None):
+        # Pop the oldest item, or None if the channel is empty. With block=True, wait until an
+        # item arrives or the channel is closed and emptied.
+        with self.condition:
+            if block:
+                self.condition.wait_for(lambda: self.count > 0 or self.closed, timeout)
+            if self.count == 0:
+                return None
+            item = self.popOldest()
+            self.condition.notify_all()
+            return item
+
+    def drain(self):
+        # Pop every queued item at once, oldest first
+        with self.condition:
+            items = []
+            while self.count > 0:
+                items.append(self.popOldest())
+            self.condition.notify_all()
+            return items
+
+    def popOldest(self):
+        # Caller must hold the condition lock
+        item = self.slots[self.head]
+        self.slots[self.head] = None
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+        self.getCount += 1
+        return item
+
+    def close(self):
+        # Wake any blocked producer or consumer and refuse further items. Queued items can
+        # still be read.
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def empty(self):
+        with self.condition:
+            return self.count == 0
+
+    def qsize(self):
+        with self.condition:
+            return self.count
+
+    def stats(self):
+        # Snapshot of queue depth and drop counters
+        with self.condition:
+            return {
+                'policy': self.policy,
+                'capacity': self.capacity,
+                'depth': self.count,
+                'maxDepth': self.maxDepth,
+                'put': self.putCount,
+                'get': self.getCount,
+                'droppedOldest': self.droppedOldest,
+                'droppedNewest': self.droppedNewest,
+            }
@@ -0,0 +1,83 @@
+import math
+import numpy as np
+
+# Screen projection and pixel-aware downsampling for the FG% graphs. A long session has far more
+# points than the graph has pixel columns, so only the first, last, lowest and highest point of
+# each column is drawn; the line still passes through every extreme. Projections are cached
+# until the points change or the time window rescales by about a pixel, and double as the
+# hover index: x grows with time, so hit-testing is a binary search.
+
+def downsampleIndices(xs, ys, columns):
+    """
+    Indices of the points to draw: the first, last, minimum and maximum of each pixel column,
+    in order. xs must be non-decreasing screen coordinates.
+    """
+    count = len(xs)
+    if count <= 2 * columns:
+        return np.arange(count)
+
+    buckets = np.clip(((xs - xs[0]) / max(xs[-1] - xs[0], 1e-9) * columns).astype(np.intp), 0, columns - 1)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], count] - 1
+
+    # Sorting by (bucket, y) puts each bucket's minimum first and maximum last
+    order = np.lexsort((ys, buckets))
+    return np.unique(np.concatenate((starts, ends, order[starts], order[ends])))
+
+class GraphProjection:
+    def __init__(self):
+        self.key = None
+        self.xs = np.zeros(0)
+        self.ys = np.zeros(0)
+        self.drawn = np.zeros(0, dtype=np.intp)  # Downsampled indices, without the hovered point
+        self.drawnXs = np.zeros(0)               # x of each drawn point, for hit-testing
+
+    def update(self, history, startTime, timeWindow, left, top, width, height):
+        """
+        Project the FG% after each shot in a ShotHistory into the graph rectangle, reusing the
+        previous projection if no shot was added or corrected and the pixel scale of the time
+        window did not change.
+        """
+        if not len(history) or timeWindow <= 0:
+            self.key = None
+            self.xs = self.ys = np.zeros(0)
+            self.drawn = np.zeros(0, dtype=np.intp)
+            self.drawnXs = np.zeros(0)
+            return
+
+        # Rescale once the right edge would move by about a pixel
+        windowStep = round(math.log(timeWindow) * width)
+        key = (len(history), history.version, startTime, windowStep, left, top, width, height)
+        if key == self.key:
+            return
+        self.key = key
+
+        self.xs = left + history.minutes(startTime) / timeWindow * width
+        self.ys = top + height - history.percentages() / 100 * height
+        self.drawn = downsampleIndices(self.xs, self.ys, max(1, int(width)))
+        self.drawnXs = self.xs[self.drawn]
+
+    def visible(self, hovered=None):
+        # Indices to draw, always including the hovered point
+        indices = self.drawn.tolist()
+        if hovered is not None and 0 <= hovered < len(self.xs) and hovered not in self.drawn:
+            indices.append(hovered)
+            indices.sort()
+        return indices
+
+    def hitTest(self, x, y, radius=10):
+        """
+        Index of the first drawn point within radius of (x, y), or None. Only drawn points
+        whose x is within radius are checked, found by bisecting their x coordinates. At most
+        four points are drawn per pixel column, so that is a bounded number of points however
+        dense the session is, and the test stays O(log n).
+        """
+        low = np.searchsorted(self.drawnXs, x - radius, side='left')
+        high = np.searchsorted(self.drawnXs, x + radius, side='right')
+        for index in self.drawn[low:high].tolist():
+            if (x - self.xs[index])**2 + (y - self.ys[index])**2 <= radius**2:
+                return index
+        return None
+
+    def position(self, index):
+        return float(self.xs[index]), float(self.ys[index])
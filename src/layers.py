@@ -0,0 +1,122 @@
+import contextlib
+import functools
+import time
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+from cmu_graphics import CMUImage
+
+# Retained-mode cache for static and slowly changing parts of the UI (tab buttons, sound
+# buttons, graph axes). Each layer is rendered once with PIL into an RGBA image together with
+# the state it depends on; a redraw draws the cached image and only re-renders when that
+# state changes (hover, tab switch, new time labels). Also tracks shapes drawn and redraw time
+# per screen.
+
+class LayerCache:
+    def __init__(self):
+        self.layers = {}    # name -> (key, CMUImage, left, top)
+        self.builds = 0
+
+    def get(self, name, key, render):
+        """
+        Cached (image, left, top) for a layer. render() -> (PIL image, left, top) is called
+        only when key differs from the key the layer was last rendered with.
+        """
+        entry = self.layers.get(name)
+        if entry is None or entry[0] != key:
+            image, left, top = render()
+            entry = (key, CMUImage(image), left, top)
+            self.layers[name] = entry
+            self.builds += 1
+        return entry[1:]
+
+    def invalidate(self, name=None):
+        if name is None:
+            self.layers.clear()
+        else:
+            self.layers.pop(name, None)
+
+#|************************| PIL DRAWING HELPERS |************************|#
+
+# Bold fonts tried in order; PIL's built-in font is the last resort
+fontFiles = ('Arial Bold.ttf', 'arialbd.ttf', 'DejaVuSans-Bold.ttf')
+
+@functools.lru_cache(maxsize=None)
+def font(size):
+    for name in fontFiles:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+def color(value, opacity=100):
+    # 'white', (r, g, b) -> RGBA tuple with the given opacity (0-100, as in cmu_graphics)
+    rgb = ImageColor.getrgb(value)[:3] if isinstance(value, str) else tuple(value)
+    return rgb + (round(opacity * 255 / 100),)
+
+def newLayer(width, height):
+    image = Image.new('RGBA', (int(width), int(height)), (0, 0, 0, 0))
+    return image, ImageDraw.Draw(image)
+
+def withOpacity(image, opacity):
+    # Scale a finished image's alpha, like opacity= on a group of cmu_graphics shapes
+    if opacity < 100:
+        image.putalpha(image.getchannel('A').point(lambda a: a * opacity // 100))
+    return image
+
+def label(draw, text, x, y, size, fill, anchor='mm'):
+    draw.text((x, y), text, font=font(size), fill=color(fill), anchor=anchor)
+
+def rotatedLabel(image, text, x, y, size, fill, angle):
+    # Centered label rotated counterclockwise by angle degrees
+    textImage, textDraw = newLayer(size * len(text) + 8, size * 2)
+    label(textDraw, text, textImage.width / 2, textImage.height / 2, size, fill)
+    rotated = textImage.rotate(angle, expand=True)
+    image.alpha_composite(rotated, (int(x - rotated.width / 2), int(y - rotated.height / 2)))
+
+#|************************| REDRAW STATS |************************|#
+
+class RedrawStats:
+    # Kept outside app state, since redrawAll may not modify the app
+    def __init__(self):
+        self.screens = {}   # screen -> [redraws, total seconds, last shape count, max shape count]
+        self.sections = {}  # section -> [calls, total seconds], timed inside a redraw
+
+    def measured(self, redrawAll):
+        # Wrap a <screen>_redrawAll function to record its time and shape count. Every draw call
+        # in a redraw adds a shape to app.group, which cmu_graphics clears before each redraw.
+        screen = redrawAll.__name__.split('_')[0]
+
+        @functools.wraps(redrawAll)
+        def wrapper(app):
+            start = time.perf_counter()
+            redrawAll(app)
+            shapeCount = len(app.group)
+            entry = self.screens.setdefault(screen, [0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+            entry[2] = shapeCount
+            entry[3] = max(entry[3], shapeCount)
+        return wrapper
+
+    @contextlib.contextmanager
+    def timed(self, section):
+        # Time one part of a redraw, e.g. drawing the camera feed image
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.sections.setdefault(section, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def sectionMs(self, section):
+        # Mean milliseconds per call of a timed section
+        calls, seconds = self.sections.get(section, (0, 0.0))
+        return seconds / calls * 1000 if calls else 0.0
+
+    def report(self):
+        return {screen: {'redraws': redraws, 'meanMs': seconds / redraws * 1000,
+                         'shapes': shapes, 'maxShapes': maxShapes}
+                for screen, (redraws, seconds, shapes, maxShapes) in self.screens.items()}
+
+redrawStats = RedrawStats()
@@ -1,15 +1,24 @@
-import pathlib
+import time
+launchTime = time.time()  # Taken before the heavier imports, for startup timing
+
 from cmu_graphics import *
 from loadAudios import getCrowdNoise
-from objectDetection import detectObjects
-from ekf import ExtendedKalmanFilter
+from pipeline import DetectionPipeline
+import objectDetection
+from persistence import DetectionPersistence
+from motionGate import MotionGate
+from displayPrep import DisplayPreparer
+from assets import AssetCache
+from graphSeries import GraphProjection
+from streaks import StreakAnalyzer
+from shotHistory import ShotHistory
+import layers
+from layers import LayerCache, redrawStats
 import cv2
 import random
-import threading
-import time
-import queue 
 import visualEffects
-from PIL import ImageGrab 
+from frameChannel import FrameChannel, DROP_OLDEST
+from PIL import Image, ImageGrab 
 
 #|************************| APP CONFIG & INITIALIZATION |************************|#
 
@@ -21,7 +30,9 @@ def onAppStart(app):
     # App dimensions
     app.width = 650
     app.height = 460
-    app.background = rgb(23, 23, 23)
+    app.backgroundColor = (23, 23, 23)
+    app.background = rgb(*app.backgroundColor)
+    app.layers = LayerCache()  # Pre-rendered static UI layers
     app.setMaxShapeCount(10000)
     
     # Camera feed layout configuration
@@ -51,28 +62,55 @@ def onAppStart(app):
     app.rimStatus = False
     app.steps = 0
     app.frameImage = None
+    app.latestResult = None  # Newest detection result, prepared for display only on the liveView screen
+    app.displayPrep = DisplayPreparer(convert_frame_to_image)
+    app.displayPrep.start()
+    app.displayStats = {'frames': 0, 'stepSeconds': 0.0, 'startTime': None}  # UI-thread time in updateFrameImage
 
     # Sound and crowd initialization
     app.crowd = 'humans'
     app.crowdSound = Sound(getCrowdNoise(app.crowd))
 
+    # Load and warm up the detector in the background so the window opens right away.
+    # modelBackend None picks the fastest validated backend; 'int8-static' or 'int8-dynamic'
+    # opts into the quantized CPU detector (see quantization.py).
+    app.modelBackend = None
+    objectDetection.modelBackend = app.modelBackend
+    app.launchTime = launchTime
+    app.firstWindowTime = None
+    app.firstDetectionTime = None
+    objectDetection.startModelLoading()
+
+    # Detection pipeline configuration
+    app.videoSource = 0  # Camera index or path to a video file, e.g. 'tests/test1.mp4'
+    app.inferenceWorkers = 2
+    app.inferenceWorkerMode = 'thread'  # 'thread' or 'process'
+    app.inferenceBatchSize = 4  # >1 batches frames from the thread workers into one forward pass (1 turns it off)
+    app.inferenceBatchDelayMs = 10
+    app.inferenceRoi = False  # Run on a crop around the locked rim, with periodic full-frame passes
+    app.motionGating = False  # Skip inference on static frames and reuse the last result
+    app.liveViewAnnotation = 'full'  # Overlay on the live view: 'full', 'boxes' or 'none'
+    app.motionGateSettings = {'pixelThreshold': 20, 'motionFraction': 0.003, 'maxSkipFrames': 15}
+    app.pipeline = None
+
+    # Decode every UI image once in the background, at the sizes it is drawn at
+    app.assets = AssetCache()
+    app.assets.start(assetVariants(app))
+
     # Initialize special effects
     visualEffects.init_fissure(app)
 
     # Queues & thresholds for detection persistence
-    app.frameQueue = queue.Queue()
-    app.ballDetectionPersistenceThreshold = 40
-    app.rimDetectionPersistenceThreshold = 20
-    app.shotMadePersistenceThreshold = 20
-
-    app.ballDetectionCounter = app.ballDetectionPersistenceThreshold  
-    app.rimDetectionCounter = app.rimDetectionPersistenceThreshold
-    app.shotMadeDetectionCounter = app.shotMadePersistenceThreshold
+    app.frameQueueCapacity = 4
+    app.frameQueuePolicy = DROP_OLDEST
+    app.frameDrainMode = True  # Apply every queued result, display only the newest frame
+    app.frameQueue = FrameChannel(app.frameQueueCapacity, app.frameQueuePolicy)
+    app.detectionPersistence = DetectionPersistence(ballThreshold=40, rimThreshold=20, shotMadeThreshold=20)
 
     # Stats and graph data
     app.sessionStartTime = 0
-    app.shotHistory = []  
-    app.graphPoints = []  
+    app.shotHistory = ShotHistory()  # Columnar; iterates as (shotNum, made, timestamp, zone) tuples
+    app.streaks = StreakAnalyzer()  # Hot/cold runs and rolling windows, updated per shot
     app.graphMargin = 40 
     app.minGraphMinutes = 0.083
 
@@ -83,6 +121,8 @@ def onAppStart(app):
     app.graphHeight = app.camFeedOutlineHeight
     app.hoveredPoint = None
     app.hoveringGraph= False
+    app.graphProjection = GraphProjection()  # Live stats graph, updated by updateGraphProjection
+    app.sessionGraphProjection = GraphProjection()
 
     # Session variables
     app.isRunning = False
@@ -118,6 +158,8 @@ def onAppStart(app):
         '7': {'name': 'right_wing', 'makes': 0, 'attempts': 0},
         '8': {'name': 'right_corner', 'makes': 0, 'attempts': 0},
     }
+    app.heatmapQuartiles = {zone: 0 for zone in app.courtZones}
+    app.heatmapImage = None  # All zone layers composited into one image, rebuilt by updateHeatmap
 
     app.manualModeButton = {
         'left': app.width//2 - 75,
@@ -218,14 +260,12 @@ def setSoundButtons(app):
 
 #|************************| UTILITIES & HELPER FUNCTIONS |************************|#
 
-def convert_frame_to_url(frame):
+def convert_frame_to_image(frame):
     """
-    Writes a captured frame to disk as a temporary image and returns its path,
-    allowing CMU Graphics to display it.
+    Wraps a captured BGR frame as an in-memory image that CMU Graphics can draw,
+    without going through a file on disk.
     """
-    temp_path = "tempFrame.jpg"
-    cv2.imwrite(temp_path, frame)
-    return temp_path
+    return CMUImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
 
 
 def updateShotPercentage(app):
@@ -250,6 +290,29 @@ def updateStreak(app, made):
         app.currentStreak = 0
 
 
+def recordFirstWindow(app):
+    """
+    Record how long the app took to get its first window up and stepping.
+    """
+    if app.firstWindowTime is None:
+        app.firstWindowTime = time.time()
+        print(f"Time to first window: {app.firstWindowTime - app.launchTime:.2f}s")
+
+
+def drawLoadingIndicator(app, y):
+    """
+    Draws an animated loading label while the detector is still loading in the background,
+    or an error label if loading it failed.
+    """
+    if objectDetection.isModelReady():
+        return
+    if objectDetection.isModelFailed():
+        drawLabel("DETECTOR FAILED TO LOAD", app.width // 2, y, size=10, fill='crimson', bold=True)
+        return
+    dots = '.' * (int(time.time() * 3) % 4)
+    drawLabel(f"LOADING DETECTOR{dots}", app.width // 2, y, size=10, fill='gray', bold=True)
+
+
 def showShotLocationPrompt(app):
     """
     Prompt the user to enter a shot location when in manual mode.
@@ -258,49 +321,121 @@ def showShotLocationPrompt(app):
     app.locationPromptStartTime = time.time()
 
 
-def updateZoneStats(app, zone, made):
+def updateZoneStats(app):
     """
-    Update zone-level shooting stats when a shot is assigned a zone.
+    Refresh zone-level shooting stats from the shot history after a zone is logged or a
+    shot is corrected.
     """
-    if zone in app.courtZones:
-        app.courtZones[zone]['attempts'] += 1
-        if made:
-            app.courtZones[zone]['makes'] += 1
+    for zone, stats in app.courtZones.items():
+        stats['makes'], stats['attempts'] = app.shotHistory.zoneStats(zone)
+    updateHeatmap(app)
+
+
+def zoneQuartile(stats):
+    """
+    Heatmap quartile (1-4) for a zone's shooting percentage, or 0 below 3 attempts.
+    """
+    if stats['attempts'] < 3:
+        return 0
+    percentage = (stats['makes'] / stats['attempts']) * 100
+    if percentage < 20:
+        return 1
+    elif percentage < 40:
+        return 2
+    elif percentage < 60:
+        return 3
+    return 4
+
+
+def updateHeatmap(app):
+    """
+    Recomposite the court heatmap into a single image, only if a zone's quartile changed.
+    """
+    quartiles = {zone: zoneQuartile(stats) for zone, stats in app.courtZones.items()}
+    if quartiles == app.heatmapQuartiles:
+        return
+    app.heatmapQuartiles = quartiles
+
+    width, height = heatmapSize(app)
+    heatmap = None
+    for zone, quartile in quartiles.items():
+        if quartile == 0:
+            continue
+        layer = app.assets.pilImage(f"images/heatmap/{zone}/{quartile}.png", width, height)
+        if heatmap is None:
+            heatmap = layer.copy()
+        else:
+            heatmap.alpha_composite(layer)
+    app.heatmapImage = CMUImage(heatmap) if heatmap is not None else None
+
+
+def heatmapSize(app):
+    # Size of the court heatmap on the stats screen
+    return app.width // 2 - 75, 200
 
 
 #|************************| CORE APP LOGIC & DETECTION |************************|#
 
 def takeStep(app):
     """
-    Process the next frame in the queue and update detection states, shots, stats, and effects.
-    Called periodically by onStep methods.
+    Process queued detection results and update detection states, shots, stats, and effects.
+    In drain mode every queued result updates the persistence counters, but only the newest
+    result is kept for display. Called periodically by onStep methods.
     """
-    if not app.frameQueue.empty():
-        ballDetected, rimDetected, shotMadeDetected, frame_with_detections = app.frameQueue.get()
+    if app.frameDrainMode:
+        results = app.frameQueue.drain()
+    else:
+        result = app.frameQueue.get()
+        results = [result] if result is not None else []
 
-        # Update ball detection persistence
-        app.ballDetectionCounter = 0 if ballDetected else app.ballDetectionCounter + 1
-        
-        # Update rim detection persistence
-        app.rimDetectionCounter = 0 if rimDetected else app.rimDetectionCounter + 1
-
-        # Check if shot made is detected
-        if shotMadeDetected:
-            # Confirm shot made only if we were previously above persistence threshold
-            if app.shotMadeDetectionCounter > app.shotMadePersistenceThreshold:
-                app.shotMadeDetectionCounter = 0
-                recordShotResult(app, made=True)
-        else:
-            app.shotMadeDetectionCounter += 1
+    if not results:
+        return
+
+    if app.firstDetectionTime is None:
+        app.firstDetectionTime = time.time()
+        print(f"Time to first detection: {app.firstDetectionTime - app.launchTime:.2f}s")
+
+    for result in results:
+        applyDetectionResult(app, result.ballDetected, result.rimDetected, result.shotMadeDetected)
 
-        # Set boolean states based on counters
-        app.ballStatus = app.ballDetectionCounter < app.ballDetectionPersistenceThreshold
-        app.rimStatus = app.rimDetectionCounter < app.rimDetectionPersistenceThreshold
-        app.shotMade = app.shotMadeDetectionCounter < app.shotMadePersistenceThreshold
+    # Keep the newest frame; updateFrameImage converts it if the camera feed is on screen
+    app.latestResult = results[-1]
+    visualEffects.update_fissure(app, time.time())
+
+
+def updateFrameImage(app):
+    """
+    Hand the newest detection result to the display-prep worker and swap in the newest
+    prepared image. Results that are replaced before the worker reaches them are never
+    converted, and the UI thread never waits on conversion.
+    """
+    start = time.perf_counter()
+    if app.latestResult is not None:
+        app.displayPrep.submit(app.latestResult, app.liveViewAnnotation)
+        app.latestResult = None
 
-        # Update displayed frame
-        app.frameImage = convert_frame_to_url(frame_with_detections)
-        visualEffects.update_fissure(app, time.time())
+    image = app.displayPrep.swap()
+    if image is not None:
+        app.frameImage = image
+
+        stats = app.displayStats
+        if stats['startTime'] is None:
+            stats['startTime'] = time.time()
+        stats['frames'] += 1
+        stats['stepSeconds'] += time.perf_counter() - start
+
+
+def applyDetectionResult(app, ballDetected, rimDetected, shotMadeDetected):
+    """
+    Update the detection persistence counters and boolean states from one detection result.
+    """
+    detection = app.detectionPersistence
+    if detection.update(ballDetected, rimDetected, shotMadeDetected):
+        recordShotResult(app, made=True)
+
+    app.ballStatus = detection.ballStatus
+    app.rimStatus = detection.rimStatus
+    app.shotMade = detection.shotMade
 
 
 def recordShotResult(app, made, timestamp=None):
@@ -321,6 +456,7 @@ def recordShotResult(app, made, timestamp=None):
     
     # Append shot history (zone unknown at this moment, can be updated after prompt)
     app.shotHistory.append((app.totalShots, made, timestamp, None))
+    app.streaks.add(app.totalShots, made, timestamp)
     
     # Update stats and streaks
     updateShotPercentage(app)
@@ -344,21 +480,9 @@ def step(app):
 
 def updateStats(app):
     """
-    Update the stats data structure (graphPoints) after each shot, reflecting performance over time.
+    Refresh the stats graph after each shot. The FG% series is read from the shot history.
     """
-    currentTime = time.time()
-    elapsedMinutes = (currentTime - app.sessionStartTime) / 60
-
-    if app.totalShots > 0:
-        percentage = (app.madeShots / app.totalShots) * 100
-        # Record or update graph points
-        if len(app.graphPoints) == 0:
-            app.graphPoints.append((elapsedMinutes, percentage, app.totalShots))
-        elif app.totalShots > app.graphPoints[-1][2]:
-            app.graphPoints.append((elapsedMinutes, percentage, app.totalShots))
-        else:
-            lastPoint = app.graphPoints[-1]
-            app.graphPoints[-1] = (elapsedMinutes, lastPoint[1], lastPoint[2])
+    updateGraphProjection(app)
 
 
 def triggerEffects(app):
@@ -370,6 +494,35 @@ def triggerEffects(app):
     app.crowdSound.play(restart=False, loop=False)
 
 
+def correctShot(app, index, made):
+    """
+    Correct the result of a recorded shot, e.g. a make detected by mistake. The history
+    updates its running totals in O(log n); counters, streaks, zones and graphs are then
+    refreshed from it. Streaks are outside the O(log n) guarantee: StreakAnalyzer is
+    append-only, so the analyzer is rebuilt from the history in O(n). Corrections are made
+    by hand, one at a time, so this is not on any per-shot or per-frame path.
+    """
+    if not app.shotHistory:
+        return
+    app.shotHistory.setMade(index, made)
+    app.madeShots = app.shotHistory.makes()
+    updateShotPercentage(app)
+
+    app.streaks = StreakAnalyzer.fromHistory(app.shotHistory)
+    app.currentStreak, app.bestStreak = app.streaks.makeStreaks()
+
+    updateZoneStats(app)
+    updateStats(app)
+
+
+def flipLastShot(app):
+    """
+    Flip the result of the most recent shot.
+    """
+    if app.shotHistory:
+        correctShot(app, -1, not app.shotHistory[-1][1])
+
+
 def simulateShotMade(app):
     """
     Manually simulate a made shot.
@@ -386,41 +539,54 @@ def simulateShotMissed(app):
 
 def startCaptureThread(app):
     """
-    Start a separate thread to read frames from the video source and perform object detection.
+    Start the staged detection pipeline: a capture thread reads frames from the video source,
+    a pool of inference workers runs object detection, and an in-order stage updates the EKF
+    and enqueues detection results.
     """
     app.isRunning = True  
-    capture_thread = threading.Thread(target=getFrames, args=(app,))
-    capture_thread.daemon = True 
-    capture_thread.start()
+    app.pipeline = DetectionPipeline(app.videoSource, app.camFeedWidth, app.camFeedHeight,
+                                     app.frameQueue, numWorkers=app.inferenceWorkers,
+                                     workerMode=app.inferenceWorkerMode,
+                                     batchSize=app.inferenceBatchSize,
+                                     batchDelayMs=app.inferenceBatchDelayMs,
+                                     roi=app.inferenceRoi,
+                                     motionGate=MotionGate(**app.motionGateSettings) if app.motionGating else None)
+    if not app.pipeline.start():
+        app.isRunning = False
 
 
-def getFrames(app):
+def stopCaptureThread(app):
     """
-    Continuously read frames from a video source, perform object detection, and enqueue results.
+    Stop the detection pipeline if it is running.
     """
-    video = 'tests/test7.mp4'
-    cam = cv2.VideoCapture(0) 
+    app.isRunning = False
+    if app.pipeline is not None:
+        app.pipeline.stop()
+        app.pipeline = None
 
-    if not cam.isOpened():
-        print("Error: Could not open video.")
-        return
 
-    fps = cam.get(cv2.CAP_PROP_FPS)
-    ekf = ExtendedKalmanFilter(dt=fps, process_noise_std=1.0, measurement_noise_std=10.0)
+#|************************| COMMON DRAWING FUNCTIONS |************************|#
 
-    while app.isRunning:
-        ret, frame = cam.read()
-        if not ret:
-            break
-        
-        frameX, frameY = app.camFeedWidth, app.camFeedHeight
-        ballDetected, rimDetected, shotMadeDetected, frame_with_detections = detectObjects(frame, frameX, frameY, ekf)
-        app.frameQueue.put((ballDetected, rimDetected, shotMadeDetected, frame_with_detections))
-        
-    cam.release()
+def assetVariants(app):
+    """
+    (path, width, height) of the images drawn at fixed sizes, prepared by the asset cache at startup.
+    """
+    variants = [("images/logo.png", 35, 35), ("images/logo.png", 100, 100), ("images/tip.png", 250, 250),
+                ("images/nostreak.png", 64, 64), ("images/beststreak.png", 60, 60),
+                ("images/heatmap/empty.png", 400, 300)]
+    variants += [(f"images/hotstreak/{i}.png", 60, 60) for i in range(1, 8)]
+    for zone in range(1, 9):
+        variants.append((f"images/heatmap/{zone}/0.png", 400, 300))
+        variants += [(f"images/heatmap/{zone}/{quartile}.png", *heatmapSize(app)) for quartile in range(1, 5)]
+    return variants
 
 
-#|************************| COMMON DRAWING FUNCTIONS |************************|#
+def drawAsset(app, path, left, top, width, height, **kwargs):
+    """
+    Draw an image from the asset cache, scaled to width x height.
+    """
+    drawImage(app.assets.image(path, width, height), left, top, **kwargs)
+
 
 def drawAssets(app):
     """
@@ -428,32 +594,42 @@ def drawAssets(app):
     """
     left = (app.width - 35) // 2
     visualEffects.draw_fissure(app)
-    drawImage("images/logo.png", left, 10, width=35, height=35)
+    drawAsset(app, "images/logo.png", left, 10, 35, 35)
 
 
 def drawTabButtons(app):
     """
-    Draws the navigation tabs at the top (liveView, stats, sounds).
+    Draws the navigation tabs at the top (liveView, stats, sounds) as one cached layer,
+    re-rendered only when the current tab or a hover opacity changes.
     """
-    for name, coords in app.buttons.items():
-        if name == "continue":
-            continue
-        elif name == "liveView":
-            text = "live feed"
-        else:
-            text = name.title()
+    tabs = [name for name in app.buttons if name != "continue"]
+    key = (app.currentTab,) + tuple(app.buttons[name]['opacity'] for name in tabs)
+    image, left, top = app.layers.get('tabs', key, lambda: renderTabButtons(app, tabs))
+    drawImage(image, left, top)
+
+
+def renderTabButtons(app, tabs):
+    """
+    Render the tab buttons into an image. Returns (image, left, top).
+    """
+    left = min(app.buttons[name]['left'] for name in tabs)
+    top = min(app.buttons[name]['top'] for name in tabs)
+    right = max(app.buttons[name]['right'] for name in tabs)
+    bottom = max(app.buttons[name]['bottom'] for name in tabs)
+    image, _ = layers.newLayer(right - left + 1, bottom - top + 1)
 
-        buttonFill = app.background if name == app.currentTab else 'white'
-        textFill = 'white' if name == app.currentTab else app.background
-        drawRect(coords['left'], coords['top'], 
-                 coords['right'] - coords['left'], 
-                 coords['bottom'] - coords['top'], 
-                 fill=buttonFill, border='white', opacity=coords["opacity"])
-        drawLabel(text.upper(), 
-                  (coords['left'] + coords['right'])/2,
-                  (coords['top'] + coords['bottom'])/2,
-                  size=12, bold=True, 
-                  fill=textFill)
+    for name in tabs:
+        coords = app.buttons[name]
+        text = "live feed" if name == "liveView" else name.title()
+        buttonFill = app.backgroundColor if name == app.currentTab else 'white'
+        textFill = 'white' if name == app.currentTab else app.backgroundColor
+
+        width, height = coords['right'] - coords['left'], coords['bottom'] - coords['top']
+        button, draw = layers.newLayer(width + 1, height + 1)
+        draw.rectangle((0, 0, width, height), fill=layers.color(buttonFill), outline=layers.color('white'))
+        layers.label(draw, text.upper(), width / 2, height / 2, 12, textFill)
+        image.alpha_composite(layers.withOpacity(button, coords["opacity"]), (coords['left'] - left, coords['top'] - top))
+    return image, left, top
 
 
 #|************************| TAB NAVIGATION & EVENT HANDLERS |************************|#
@@ -495,8 +671,22 @@ def keypress(app, key):
         simulateShotMade(app)
     elif key == 's':
         simulateShotMissed(app)
+    elif key == 'x':
+        flipLastShot(app)
     elif key == 'f':
         setActiveScreen('session')
+    elif key == 'q':
+        print(f"Frame queue: {app.frameQueue.stats()}")
+        if app.pipeline is not None:
+            print(f"Pipeline: {app.pipeline.stats()}")
+        print(f"Display prep: {app.displayPrep.stats()}")
+        display = app.displayStats
+        if display['frames']:
+            elapsed = time.time() - display['startTime']
+            print(f"Display: {display['frames'] / elapsed if elapsed > 0 else 0:.1f} fps, "
+                  f"{display['stepSeconds'] / display['frames'] * 1000:.2f} ms UI step time per frame, "
+                  f"{redrawStats.sectionMs('cameraFeed'):.2f} ms UI draw time per redraw")
+        print(f"Redraw: {redrawStats.report()}, layer builds: {app.layers.builds}")
 
 
 #|************************| START SCREEN |************************|#
@@ -504,13 +694,18 @@ def keypress(app, key):
 def start_onMousePress(app, x, y):
     setActiveScreen('tip')
 
+def start_onStep(app):
+    recordFirstWindow(app)
+
+@redrawStats.measured
 def start_redrawAll(app):
     centerX, centerY = app.width // 2, app.height // 2
     left, top = (app.width - 100) // 2, centerY - 75
 
-    drawImage("images/logo.png", left, top, width=100, height=100)
+    drawAsset(app, "images/logo.png", left, top, 100, 100)
     drawLabel("ASSISTLY", centerX, top + 100 + 10, size=20, fill='white', bold=True)
     drawLabel(app.message, centerX, centerY + 100, size=12, fill='white', italic=True, bold=True)
+    drawLoadingIndicator(app, centerY + 120)
 
 
 #|************************| TIP SCREEN |************************|#
@@ -529,6 +724,9 @@ def tip_onMousePress(app, x, y):
         startCaptureThread(app)
         setActiveScreen('liveView')
 
+def tip_onStep(app):
+    recordFirstWindow(app)
+
 def tip_onKeyPress(app, key):
     if key == 't':
         app.manualMode = not app.manualMode
@@ -570,16 +768,18 @@ def drawContinueButton(app, x):
     height = continueButton['bottom'] - continueButton['top']
     drawLabel(app.message, x, continueButton['top'] + height//2, size=10, fill=app.background, bold=True, align="center")
 
+@redrawStats.measured
 def tip_redrawAll(app):
     centerX, y = app.width // 2, (app.height // 2) + 65
     drawAssets(app)
     drawLabel("TIP", centerX, 65, size=15, fill='white', bold=True)
-    drawImage("images/tip.png", centerX - 125, 75, width=250, height=250)
+    drawAsset(app, "images/tip.png", centerX - 125, 75, 250, 250)
     drawLabel("For best detection results ensure the camera is at an angle", centerX, y, size=12, bold=True, align='center', fill='white')
     drawLabel("between 30 - 45 degrees to the basket", centerX, y + 15, size=12, bold=True, align='center', fill='white')
     drawLabel("*** Press T to Toggle Mode ***", centerX, y + 40, size=12, bold=True, align='center', fill='white')
     drawContinueButton(app, centerX)
     drawManualModeButton(app)
+    drawLoadingIndicator(app, app.height - 15)
 
 
 #|************************| LIVEVIEW SCREEN |************************|#
@@ -600,9 +800,8 @@ def liveView_onKeyPress(app, key):
         app.tempShotLocation = zone
         app.zoneSelectionTime = time.time()  # Record the time of selection
         if app.shotHistory:
-            shotNum, made, timestamp, _ = app.shotHistory[-1]
-            app.shotHistory[-1] = (shotNum, made, timestamp, zone)
-        updateZoneStats(app, zone, made)
+            app.shotHistory.setZone(-1, zone)
+        updateZoneStats(app)
         return
     else:
         keypress(app, key)
@@ -618,15 +817,15 @@ def liveView_onStep(app):
     Periodic update while on the liveView screen. Handles time-bound location prompts.
     """
     takeStep(app)
+    updateFrameImage(app)
 
     if app.showLocationPrompt:
         timeElapsed = time.time() - app.locationPromptStartTime
         if timeElapsed > app.locationPromptDuration:
             app.showLocationPrompt = False
             if app.shotHistory:
-                shotNum, made, timestamp, _ = app.shotHistory[-1]
-                app.shotHistory[-1] = (shotNum, made, timestamp, None)
-                updateZoneStats(app, None, made)
+                app.shotHistory.setZone(-1, None)
+                updateZoneStats(app)
     
     if app.zoneSelectionTime is not None:
         if (time.time() - app.zoneSelectionTime) > 0.2:
@@ -634,6 +833,7 @@ def liveView_onStep(app):
             app.zoneSelectionTime = None
             app.showLocationPrompt = False
         
+@redrawStats.measured
 def liveView_redrawAll(app):
     drawAssets(app)
     drawTabButtons(app)
@@ -652,17 +852,16 @@ def drawCurrentStreak(app):
     x = app.camFeedOutlineLeft + 378
     y = app.height - 77
     if app.currentStreak < 3:
-        drawImage("images/nostreak.png", x, y, width=64, height=64, opacity=100)
+        drawAsset(app, "images/nostreak.png", x, y, 64, 64)
     else:
-        hotstreak_files = list(pathlib.Path('images/hotstreak').glob('*.png'))
-        hotstreak_path = random.choice(hotstreak_files)
-        drawImage(str(hotstreak_path), x+2, y - 5, width=60, height=60, opacity=100)
+        hotstreak_path = random.choice(app.assets.paths('images/hotstreak'))
+        drawAsset(app, hotstreak_path, x+2, y - 5, 60, 60)
 
 def drawBestStreak(app):
     """
     Draws the best streak icon on the liveView screen.
     """
-    drawImage("images/beststreak.png", app.camFeedOutlineLeft + 485, app.height - 75, width=60, height=60, opacity=100)
+    drawAsset(app, "images/beststreak.png", app.camFeedOutlineLeft + 485, app.height - 75, 60, 60)
 
 def drawShotStats(app):
     """
@@ -729,7 +928,8 @@ def drawCameraFeed(app):
 
     # Draw Frame or Placeholder
     if app.frameImage is not None:
-        drawImage(app.frameImage, app.camFeedLeft, app.camFeedTop)
+        with redrawStats.timed('cameraFeed'):
+            drawImage(app.frameImage, app.camFeedLeft, app.camFeedTop)
     else:
         drawRect(app.camFeedLeft, app.camFeedTop, app.camFeedWidth, app.camFeedHeight, fill=app.background)
         drawLabel(app.message, centerX, centerY, size=12, bold=True, fill='white')
@@ -756,10 +956,10 @@ def drawShotLocationPrompt(app):
 
     if zoneSelectedRecently:
         # Show the selected zone image
-        drawImage(f"images/heatmap/{app.tempShotLocation}/0.png", imageLeft, imageTop, width=imageWidth, height=imageHeight)
+        drawAsset(app, f"images/heatmap/{app.tempShotLocation}/0.png", imageLeft, imageTop, imageWidth, imageHeight)
     else:
         # Show empty heatmap image if still within prompt duration (or for the flashing effect after prompt closed)
-        drawImage("images/heatmap/empty.png", imageLeft, imageTop, width=imageWidth, height=imageHeight)
+        drawAsset(app, "images/heatmap/empty.png", imageLeft, imageTop, imageWidth, imageHeight)
 
     timeElapsed = time.time() - app.locationPromptStartTime
     timeLeft = max(0, app.locationPromptDuration - timeElapsed)
@@ -794,6 +994,7 @@ def stats_onScreenActivate(app):
 
 def stats_onStep(app):
     takeStep(app)
+    updateGraphProjection(app)
 
 def stats_onKeyPress(app, key):
     keypress(app,key)
@@ -806,9 +1007,6 @@ def stats_onMouseMove(app, x, y):
     Handle mouse movement on the stats screen, for hovering over data points in the graph.
     """
     tabHover(app, x, y)
-    currentTime = time.time()
-    elapsedMinutes = (currentTime - app.sessionStartTime) / 60
-    timeWindow = max(elapsedMinutes, app.minGraphMinutes)
     
     if (app.graphLeft <= x <= app.graphLeft + app.graphWidth and
             app.graphTop <= y <= app.graphTop + app.graphHeight):
@@ -816,15 +1014,9 @@ def stats_onMouseMove(app, x, y):
     else:
         app.hoveringGraph = False
 
-    app.hoveredPoint = None
-    for i, point in enumerate(app.graphPoints):
-        pointX = app.graphLeft + (point[0] / timeWindow) * app.graphWidth
-        pointY = app.graphTop + app.graphHeight - (point[1]/100 * app.graphHeight)
-        
-        # Check if mouse is near a graph point
-        if ((x - pointX)**2 + (y - pointY)**2) <= 100:
-            app.hoveredPoint = i
-            break
+    # Check if mouse is near a graph point
+    updateGraphProjection(app)
+    app.hoveredPoint = app.graphProjection.hitTest(x, y)
 
 
 #|************************| STATS SCREEN DRAWING |************************|#
@@ -909,7 +1101,7 @@ def drawInfoBox(app, x, y, pointIndex, percentage, made, total):
         if not location:
             drawLabel("NO LOGGED LOCATION", boxLeft + boxWidth/2, textY + imageHeight // 2, fill='white', size=9, bold=True)
         else:
-            drawImage(f"images/heatmap/{location}/0.png", boxLeft + padding, textY, width=boxWidth - 2 * padding, height=imageHeight)
+            drawAsset(app, f"images/heatmap/{location}/0.png", boxLeft + padding, textY, boxWidth - 2 * padding, imageHeight)
 
 def drawPoint(app, x, y, isHovered, isCurrent=False):
     """
@@ -922,90 +1114,102 @@ def drawPoint(app, x, y, isHovered, isCurrent=False):
     else:
         drawCircle(x, y, baseRadius, fill='white')
 
+def updateGraphProjection(app):
+    """
+    Refresh the cached screen coordinates of the stats graph for the current time window.
+    """
+    elapsedMinutes = (time.time() - app.sessionStartTime) / 60
+    timeWindow = max(elapsedMinutes, app.minGraphMinutes)
+    app.graphProjection.update(app.shotHistory, app.sessionStartTime, timeWindow,
+                               app.graphLeft, app.graphTop, app.graphWidth, app.graphHeight)
+
 def drawGraph(app):
     """
-    Draws the performance graph (FG% over time) on the stats screen.
+    Draws the performance graph (FG% over time) on the stats screen. Long sessions are
+    downsampled to the graph's pixel width, keeping each column's extremes and the hovered point.
     """
     currentTime = time.time()
     elapsedMinutes = (currentTime - app.sessionStartTime) / 60
     timeWindow = max(elapsedMinutes, app.minGraphMinutes)
     
-    drawRect(app.graphLeft, app.graphTop, app.graphWidth, app.graphHeight, 
-             fill=None, border='white')
-    
-    # Time markers
+    # Axes, gridlines and labels: one cached layer, re-rendered when the time labels change
     numTimeMarkers = 5
-    for i in range(numTimeMarkers + 1):
-        timeValue = (timeWindow * i) / numTimeMarkers
-        x = app.graphLeft + (i * app.graphWidth / numTimeMarkers)
-        timeLabel = formatTimeLabel(timeValue)
-        drawLabel(timeLabel, x, app.graphTop + app.graphHeight + 20,
-                  fill='white', bold=True, size=10)
-        if i > 0:
-            drawLine(x, app.graphTop, x, app.graphTop + app.graphHeight,
-                     fill='gray', opacity=30)
-    
-    drawLabel("TIME", 
-              app.graphLeft + app.graphWidth/2, 
-              app.graphTop + app.graphHeight + 35,
-              fill='white', bold=True, size=12)
-    drawLabel("FG %", 
-              app.graphLeft - 45, 
-              app.graphTop + app.graphHeight/2,
-              fill='white', bold=True, size=12, rotateAngle=270)
-    
-    # FG% markers
-    for i in range(0, 101, 20):
-        y = app.graphTop + app.graphHeight - (i/100 * app.graphHeight)
-        drawLabel(f"{i}%", app.graphLeft - 10, y, 
-                  fill='white', bold=True, size=10, align='right')
-        drawLine(app.graphLeft, y, app.graphLeft + app.graphWidth, y,
-                 fill='gray', opacity=30)
+    timeLabels = tuple(formatTimeLabel((timeWindow * i) / numTimeMarkers) for i in range(numTimeMarkers + 1))
+    image, left, top = app.layers.get('graphAxes', timeLabels, lambda: renderGraphAxes(app, timeLabels))
+    drawImage(image, left, top)
     
     # Draw data lines
-    if len(app.graphPoints) > 0:
-        x0 = app.graphLeft
-        # First point
-        x1 = app.graphLeft + (app.graphPoints[0][0] / timeWindow) * app.graphWidth
-        y1 = app.graphTop + app.graphHeight - (app.graphPoints[0][1]/100 * app.graphHeight)
-        drawLine(x0, y1, x1, y1, fill='lightBlue', lineWidth=2)
-        drawPoint(app, x1, y1, app.hoveredPoint == 0)
-        
-        fx, fy, fi = 0, 0, 0
-        # Middle points
-        for i in range(len(app.graphPoints)-1):
-            x1 = app.graphLeft + (app.graphPoints[i][0] / timeWindow) * app.graphWidth
-            y1 = app.graphTop + app.graphHeight - (app.graphPoints[i][1]/100 * app.graphHeight)
-            x2 = app.graphLeft + (app.graphPoints[i+1][0] / timeWindow) * app.graphWidth
-            y2 = app.graphTop + app.graphHeight - (app.graphPoints[i+1][1]/100 * app.graphHeight)
-            
-            drawLine(x1, y1, x2, y2, fill='lightBlue', lineWidth=2)
-            drawPoint(app, x1, y1, app.hoveredPoint == i)
-            
-            if app.hoveredPoint == i:
-                fx, fy, fi = x1, y1, i
+    projection = app.graphProjection
+    shotCount = len(app.shotHistory)
+    if shotCount > 0 and len(projection.xs) == shotCount:
+        indices = projection.visible(app.hoveredPoint)
+
+        # Lead-in from the left edge to the first point
+        x1, y1 = projection.position(0)
+        drawLine(app.graphLeft, y1, x1, y1, fill='lightBlue', lineWidth=2)
+
+        for a, b in zip(indices, indices[1:]):
+            drawLine(*projection.position(a), *projection.position(b), fill='lightBlue', lineWidth=2)
+        for i in indices[:-1]:
+            drawPoint(app, *projection.position(i), app.hoveredPoint == i)
+
+        fi = app.hoveredPoint
+        if fi is not None:
+            fx, fy = projection.position(fi)
         
         # Last point
-        lastX = app.graphLeft + (app.graphPoints[-1][0] / timeWindow) * app.graphWidth
-        lastY = app.graphTop + app.graphHeight - (app.graphPoints[-1][1]/100 * app.graphHeight)
+        lastX, lastY = projection.position(-1)
         currentX = app.graphLeft + (elapsedMinutes / timeWindow) * app.graphWidth
         
         drawLine(lastX, lastY, currentX, lastY, fill='lightBlue', lineWidth=2)
-        isLastPointHovered = app.hoveredPoint == len(app.graphPoints)-1
+        isLastPointHovered = app.hoveredPoint == shotCount-1
         drawPoint(app, lastX, lastY, isLastPointHovered)
         
         # Info box for hovered points
         if not app.hoveringGraph and app.hoveredPoint is None:
-            drawInfoBox(app, lastX, lastY, len(app.graphPoints), 
+            drawInfoBox(app, lastX, lastY, shotCount, 
                         app.shotPercentage, app.madeShots, app.totalShots)
         if app.hoveredPoint is not None and not isLastPointHovered:
-            madeShots = int((app.graphPoints[fi][1] / 100) * app.graphPoints[fi][2])
-            drawInfoBox(app, fx, fy, fi+1, app.graphPoints[fi][1], 
-                        madeShots, app.graphPoints[fi][2])
+            madeShots = app.shotHistory.makes(0, fi+1)
+            drawInfoBox(app, fx, fy, fi+1, app.shotHistory.percentage(fi), 
+                        madeShots, fi+1)
         elif isLastPointHovered:
-            drawInfoBox(app, lastX, lastY, len(app.graphPoints),
+            drawInfoBox(app, lastX, lastY, shotCount,
                         app.shotPercentage, app.madeShots, app.totalShots)
 
+def renderGraphAxes(app, timeLabels):
+    """
+    Render the stats graph frame, gridlines, time and FG% markers and axis titles into an
+    image. Returns (image, left, top).
+    """
+    left = app.graphLeft - 60
+    top = app.graphTop - 10
+    image, draw = layers.newLayer(app.graphWidth + 90, app.graphHeight + 55)
+    graphLeft, graphTop = app.graphLeft - left, app.graphTop - top
+    gridColor = layers.color('gray', 30)
+
+    draw.rectangle((graphLeft, graphTop, graphLeft + app.graphWidth, graphTop + app.graphHeight),
+                   outline=layers.color('white'))
+    
+    # Time markers
+    numTimeMarkers = len(timeLabels) - 1
+    for i, timeLabel in enumerate(timeLabels):
+        x = graphLeft + (i * app.graphWidth / numTimeMarkers)
+        layers.label(draw, timeLabel, x, graphTop + app.graphHeight + 20, 10, 'white')
+        if 0 < i < numTimeMarkers:
+            draw.line((x, graphTop, x, graphTop + app.graphHeight), fill=gridColor)
+    
+    layers.label(draw, "TIME", graphLeft + app.graphWidth/2, graphTop + app.graphHeight + 35, 12, 'white')
+    layers.rotatedLabel(image, "FG %", graphLeft - 45, graphTop + app.graphHeight/2, 12, 'white', 90)
+    
+    # FG% markers
+    for i in range(0, 101, 20):
+        y = graphTop + app.graphHeight - (i/100 * app.graphHeight)
+        layers.label(draw, f"{i}%", graphLeft - 10, y, 10, 'white', anchor='rm')
+        if 0 < i < 100:
+            draw.line((graphLeft, y, graphLeft + app.graphWidth, y), fill=gridColor)
+    return image, left, top
+
 def drawShotHistory(app):
     """
     Draws a panel on the stats screen showing recent shot history and elapsed session time.
@@ -1056,6 +1260,7 @@ def drawShotHistory(app):
               fill=app.background, size=12)
     drawRect(app.historyLeft + 20, startY - 20, shotWidth, app.camFeedOutlineHeight - 64, fill=None, border='white')
 
+@redrawStats.measured
 def stats_redrawAll(app):
     drawAssets(app)
     drawTabButtons(app)
@@ -1070,20 +1275,35 @@ def sounds_onScreenActivate(app):
 
 def drawSoundButtons(app):
     """
-    Draws the four sound option buttons (humans, dogs, minions, cows).
+    Draws the four sound option buttons (humans, dogs, minions, cows) as one cached layer,
+    re-rendered only when the selected crowd or a hover opacity changes.
+    """
+    key = (app.crowd,) + tuple(coords['opacity'] for coords in app.soundButtons.values())
+    image, left, top = app.layers.get('soundButtons', key, lambda: renderSoundButtons(app))
+    drawImage(image, left, top)
+
+def renderSoundButtons(app):
     """
+    Render the sound buttons into an image. Returns (image, left, top).
+    """
+    margin = 3  # Half the border width, which is centered on the button edge
+    left = min(coords['left'] for coords in app.soundButtons.values()) - margin
+    top = min(coords['top'] for coords in app.soundButtons.values()) - margin
+    right = max(coords['right'] for coords in app.soundButtons.values()) + margin
+    bottom = max(coords['bottom'] for coords in app.soundButtons.values()) + margin
+    image, _ = layers.newLayer(right - left + 1, bottom - top + 1)
+
     for name, coords in app.soundButtons.items():
-        textFill = 'white'
         outline = 'white' if name == app.crowd else 'gray'
-        drawRect(coords['left'], coords['top'], 
-                 coords['right'] - coords['left'], 
-                 coords['bottom'] - coords['top'], 
-                 fill=app.background, border=outline, borderWidth=5, opacity=coords["opacity"])
-        drawLabel(name.upper(), 
-                  (coords['left'] + coords['right'])/2,
-                  (coords['top'] + coords['bottom'])/2,
-                  size=12, bold=True, 
-                  fill=textFill)
+        width, height = coords['right'] - coords['left'], coords['bottom'] - coords['top']
+        button, draw = layers.newLayer(width + 2 * margin + 1, height + 2 * margin + 1)
+        draw.rectangle((margin, margin, margin + width, margin + height), fill=layers.color(app.backgroundColor))
+        draw.rectangle((margin - 2, margin - 2, margin + width + 2, margin + height + 2),
+                       outline=layers.color(outline), width=5)
+        layers.label(draw, name.upper(), margin + width / 2, margin + height / 2, 12, 'white')
+        image.alpha_composite(layers.withOpacity(button, coords["opacity"]),
+                              (coords['left'] - margin - left, coords['top'] - margin - top))
+    return image, left, top
 
 def soundButtonHover(app, x, y):
     """
@@ -1122,6 +1342,7 @@ def sounds_onMousePress(app, x, y):
     tabPress(app, x, y)
     soundButtonPress(app, x, y)
 
+@redrawStats.measured
 def sounds_redrawAll(app):
     drawAssets(app)
     drawTabButtons(app)
@@ -1138,14 +1359,20 @@ def session_onScreenActivate(app):
     app.currentTab = 'session'
     app.message = "SESSION SUMMARY"
     
-    app.isRunning = False  
-    app.frameQueue = queue.Queue()
+    stopCaptureThread(app)
+    app.frameQueue.close()
+    app.frameQueue = FrameChannel(app.frameQueueCapacity, app.frameQueuePolicy)
     app.frameImage = None
+    app.latestResult = None
+    app.displayPrep.clear()
     app.crowdSound = None
     
     app.sessionEndTime = time.time()
     app.hotPeriod, app.coldPeriod = findStreakPeriods(app)
     app.sessionHoveredPoint = None
+    if app.shotHistory:
+        app.sessionGraphProjection.update(app.shotHistory, app.sessionStartTime, sessionMinutes(app),
+                                          *sessionGraphRect(app))
 
     app.exportButton = {
         'left': app.width - 150,
@@ -1177,31 +1404,14 @@ def session_onMouseMove(app, x, y):
         app.exportButton['opacity'] = 100
     
 
-    if app.manualMode:
-        graphLeft = 50
-        graphTop = 140
-        graphWidth = app.width//2 - 75
-        graphHeight = 200
-    else:
-        graphLeft = 60
-        graphTop = 140
-        graphWidth = app.width - 100
-        graphHeight = 200
+    graphLeft, graphTop, graphWidth, graphHeight = sessionGraphRect(app)
     
     # Check if mouse is within graph bounds
     if (graphLeft <= x <= graphLeft + graphWidth and 
         graphTop <= y <= graphTop + graphHeight):
         
-        # Find nearest point
-        app.sessionHoveredPoint = None
-        if len(app.graphPoints) > 0:
-            for i, point in enumerate(app.graphPoints):
-                pointX = graphLeft + (point[0] / app.graphPoints[-1][0]) * graphWidth
-                pointY = graphTop + graphHeight - (point[1] / 100) * graphHeight
-                
-                if ((x - pointX)**2 + (y - pointY)**2) <= 100:  # 10px radius
-                    app.sessionHoveredPoint = i
-                    break
+        # Find nearest point (10px radius)
+        app.sessionHoveredPoint = app.sessionGraphProjection.hitTest(x, y)
     else:
         app.sessionHoveredPoint = None
 
@@ -1231,6 +1441,7 @@ def drawExportButton(app):
               (app.exportButton['top'] + app.exportButton['bottom']) / 2,
               size=10, bold=True, fill=app.background, align='center')
 
+@redrawStats.measured
 def session_redrawAll(app):
     centerX = app.width // 2
     drawAssets(app)
@@ -1255,112 +1466,12 @@ def exportSessionSummary(app):
 
 def findStreakPeriods(app):
     """
-    Analyze the shot history to find the hottest and coldest streak periods of shooting.
+    Find the hottest and coldest streak periods of shooting.
     A "hot" period is one with at least 3 makes in a window, and a "cold" period is one
-    with at least 3 misses. Also considers consecutive streaks.
+    with at least 3 misses. Also considers consecutive streaks. The analysis is kept up to
+    date shot by shot in app.streaks, so this does not rescan the shot history.
     """
-    if len(app.shotHistory) < 3:
-        return None, None
-
-    window_size = 5
-    best_hot_period = None
-    best_cold_period = None
-    max_hot_percentage = 0
-    min_cold_percentage = 100
-    
-    current_streak = []
-    longest_make_streak = []
-    longest_miss_streak = []
-    
-    # Analyze shots for rolling windows and longest streaks
-    for i, shot in enumerate(app.shotHistory):
-        shot_num, made, timestamp, location = shot
-        
-        # Consecutive streak tracking
-        if not current_streak or current_streak[0][1] == made:
-            current_streak.append(shot)
-        else:
-            if current_streak[0][1]:
-                if len(current_streak) > len(longest_make_streak):
-                    longest_make_streak = current_streak.copy()
-            else:
-                if len(current_streak) > len(longest_miss_streak):
-                    longest_miss_streak = current_streak.copy()
-            current_streak = [shot]
-        
-        # Rolling window analysis
-        if i >= window_size - 1:
-            window = app.shotHistory[i-window_size+1:i+1]
-            makes_in_window = sum(1 for _, m, _, _ in window if m)
-            percentage = (makes_in_window / window_size) * 100
-            
-            # Update hot period
-            if percentage > max_hot_percentage and makes_in_window >= 3:
-                max_hot_percentage = percentage
-                best_hot_period = (
-                    window[0][2],
-                    window[-1][2],
-                    percentage,
-                    window_size,
-                    True,
-                    [shot[0] for shot in window]
-                )
-            
-            # Update cold period
-            if percentage < min_cold_percentage and (window_size - makes_in_window) >= 3:
-                min_cold_percentage = percentage
-                best_cold_period = (
-                    window[0][2],
-                    window[-1][2],
-                    percentage,
-                    window_size,
-                    False,
-                    [shot[0] for shot in window]
-                )
-    
-    # Check final streak
-    if current_streak:
-        if current_streak[0][1]:
-            if len(current_streak) > len(longest_make_streak):
-                longest_make_streak = current_streak
-        else:
-            if len(current_streak) > len(longest_miss_streak):
-                longest_miss_streak = current_streak
-
-    hot_period = None
-    cold_period = None
-    
-    # Determine final hot period
-    if longest_make_streak and len(longest_make_streak) >= 3:
-        consecutive_hot = (
-            longest_make_streak[0][2],
-            longest_make_streak[-1][2],
-            100.0,
-            len(longest_make_streak),
-            True,
-            [shot[0] for shot in longest_make_streak]
-        )
-        hot_period = consecutive_hot if not best_hot_period else \
-            max([consecutive_hot, best_hot_period], key=lambda x: (x[2], x[3]))
-    else:
-        hot_period = best_hot_period
-    
-    # Determine final cold period
-    if longest_miss_streak and len(longest_miss_streak) >= 3:
-        consecutive_cold = (
-            longest_miss_streak[0][2],
-            longest_miss_streak[-1][2],
-            0.0,
-            len(longest_miss_streak),
-            False,
-            [shot[0] for shot in longest_miss_streak]
-        )
-        cold_period = consecutive_cold if not best_cold_period else \
-            min([consecutive_cold, best_cold_period], key=lambda x: (x[2], -x[3]))
-    else:
-        cold_period = best_cold_period
-
-    return hot_period, cold_period
+    return app.streaks.periods()
 
 def drawHotColdPeriods(app):
     """
@@ -1414,27 +1525,33 @@ def drawOverallStats(app, centerX):
     drawLabel("SHOTS/MIN", centerX + 200, statsY, size=12, bold=True, fill='white')
     drawLabel(f"{shotsPerMinute:.1f}", centerX + 200, statsY + 25, size=24, bold=True, fill='white')
 
-def drawShootingTrendsGraph(app):
+def sessionMinutes(app):
+    """
+    Minutes from the session start to the last shot: the time axis of the shooting trends graph.
+    """
+    return (app.shotHistory[-1][2] - app.sessionStartTime) / 60
+
+def sessionGraphRect(app):
     """
-    Draw the shooting trends graph (FG% over time) on the end session screen.
-    If manual mode is enabled, graph dimensions are smaller (half screen).
+    (left, top, width, height) of the shooting trends graph. If manual mode is enabled,
+    the graph is smaller (half screen) to leave room for the heatmap.
     """
     if app.manualMode:
-        graphLeft = 50
-        graphTop = 140
-        graphWidth = app.width//2 - 75
-        graphHeight = 200
-    else:
-        graphLeft = 60
-        graphTop = 140
-        graphWidth = app.width - 100
-        graphHeight = 200
+        return 50, 140, app.width//2 - 75, 200
+    return 60, 140, app.width - 100, 200
+
+def drawShootingTrendsGraph(app):
+    """
+    Draw the shooting trends graph (FG% over time) on the end session screen, downsampled
+    to the graph's pixel width like the live graph.
+    """
+    graphLeft, graphTop, graphWidth, graphHeight = sessionGraphRect(app)
     
     drawRect(graphLeft, graphTop, graphWidth, graphHeight, 
              fill=None, border='white')
     
-    if len(app.graphPoints) > 0:
-        totalTime = app.graphPoints[-1][0]
+    if len(app.shotHistory) > 0:
+        totalTime = sessionMinutes(app)
         
         # Time labels
         for i in range(6):
@@ -1468,66 +1585,35 @@ def drawShootingTrendsGraph(app):
                      fill='lightblue', opacity=20)
         
         # Draw trend line and points
-        prevX = None
-        prevY = None
-        fx, fy, fi = 0, 0, 0
-        hovered = False
-
-        for i, point in enumerate(app.graphPoints):
-            x = graphLeft + (point[0] / totalTime) * graphWidth
-            y = graphTop + graphHeight - (point[1] / 100) * graphHeight
-            
-            if prevX is not None:
-                drawLine(prevX, prevY, x, y, fill='lightBlue', lineWidth=2)
-            
-            isHovered = (app.sessionHoveredPoint == i)
-            pointRadius = 5 if isHovered else 3
+        projection = app.sessionGraphProjection
+        indices = projection.visible(app.sessionHoveredPoint)
+        for a, b in zip(indices, indices[1:]):
+            drawLine(*projection.position(a), *projection.position(b), fill='lightBlue', lineWidth=2)
+        for i in indices:
+            x, y = projection.position(i)
+            pointRadius = 5 if app.sessionHoveredPoint == i else 3
             drawCircle(x, y, pointRadius, fill='white')
             
-            if isHovered:
-                fx, fy, fi = x, y, i
-                hovered = True
-            
-            prevX = x
-            prevY = y
-            
-        if hovered:
-            drawInfoBox(app, fx, fy, fi+1, app.graphPoints[fi][1], 
-                        int(app.graphPoints[fi][1] * app.graphPoints[fi][2] / 100), 
-                        int(app.graphPoints[fi][2]))
+        fi = app.sessionHoveredPoint
+        if fi is not None:
+            fx, fy = projection.position(fi)
+            drawInfoBox(app, fx, fy, fi+1, app.shotHistory.percentage(fi), 
+                        app.shotHistory.makes(0, fi+1), fi+1)
 
 def drawCourtHeatmap(app):
     """
     Draw a simple court representation and a zone-based heatmap. Each zone's shooting percentage is mapped 
-    into quartiles and the corresponding image is displayed.
+    into quartiles and the corresponding images are composited by updateHeatmap.
     """
     if not app.manualMode:
         return
 
     courtLeft = app.width // 2 + 25
     courtTop = 140
-    courtWidth = app.width // 2 - 75
-    courtHeight = 200
+    courtWidth, courtHeight = heatmapSize(app)
 
-
-    for zone_key, stats in app.courtZones.items():
-        attempts = stats['attempts']
-        makes = stats['makes']
-
-        if attempts < 3:
-            continue
-        else:
-            percentage = (makes / attempts) * 100
-
-            if percentage < 20:
-                quartile = 1
-            elif percentage < 40:
-                quartile = 2
-            elif percentage < 60:
-                quartile = 3
-            else:
-                quartile = 4
-            drawImage(f"images/heatmap/{zone_key}/{quartile}.png", courtLeft, courtTop, width=courtWidth, height=courtHeight)
+    if app.heatmapImage is not None:
+        drawImage(app.heatmapImage, courtLeft, courtTop)
     
     padding = 60
     boxTop = courtTop + courtHeight + 10
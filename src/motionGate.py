@@ -0,0 +1,52 @@
+import cv2
+
+# Cheap motion gate in front of the detector. Each frame is shrunk to a small grayscale
+# thumbnail and compared with the thumbnail of the last frame that went through inference.
+# If too few pixels changed, the frame is "static" and the previous detection result can be
+# reused while the EKF keeps predicting forward.
+
+class MotionGate:
+    def __init__(self, thumbnailWidth=96, pixelThreshold=20, motionFraction=0.003, maxSkipFrames=15):
+        self.thumbnailWidth = thumbnailWidth    # Width of the grayscale thumbnail used for differencing
+        self.pixelThreshold = pixelThreshold    # Grey-level change that counts a pixel as moving
+        self.motionFraction = motionFraction    # Fraction of moving pixels that counts as motion
+        self.maxSkipFrames = maxSkipFrames      # Force an inference after this many skipped frames
+
+        self.reference = None
+        self.skipped = 0
+
+        # Stats
+        self.gatedFrames = 0
+        self.inferredFrames = 0
+
+    def thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.thumbnailWidth / w))
+        small = cv2.resize(frame, (self.thumbnailWidth, height), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (3, 3), 0)
+
+    def shouldInfer(self, frame):
+        """
+        Decide whether a frame needs inference. Must be called in frame order.
+        """
+        current = self.thumbnail(frame)
+        if self.reference is not None and self.skipped < self.maxSkipFrames:
+            diff = cv2.absdiff(current, self.reference)
+            moving = cv2.countNonZero(cv2.threshold(diff, self.pixelThreshold, 255, cv2.THRESH_BINARY)[1])
+            if moving < self.motionFraction * diff.size:
+                self.skipped += 1
+                self.gatedFrames += 1
+                return False
+
+        self.reference = current
+        self.skipped = 0
+        self.inferredFrames += 1
+        return True
+
+    def stats(self):
+        total = self.gatedFrames + self.inferredFrames
+        return {
+            'gated': self.gatedFrames,
+            'inferred': self.inferredFrames,
+            'gatedRatio': self.gatedFrames / total if total else 0,
+        }
@@ -1,85 +1,268 @@
-from ultralytics import YOLO
-import cv2
+import threading
+import time
+from concurrent.futures import Future
 import numpy as np
-from ekf import ExtendedKalmanFilter
+import backends
+from preprocessing import Preprocessor
 
-# Initialize YOLO model
-model = YOLO('v11.pt')
 detClasses = {0: 'Ball', 1: 'Made Shot', 2: 'Person', 3: 'Rim', 4: 'Shot'}
+BALL, MADE_SHOT, PERSON, RIM, SHOT = 0, 1, 2, 3, 4
+trackedClasses = [BALL, MADE_SHOT, RIM]  # "Person" and "Shot" are never used
 
-def detectObjects(frame, outputWidth, outputHeight, ekf):
-    # Image output resizing
-    h, w = frame.shape[:2]
+# One row per detection: class id, confidence and (x1, y1, x2, y2) box
+detectionDtype = np.dtype([('cls', np.uint8), ('conf', np.float32), ('box', np.float32, (4,))])
+emptyDetections = np.zeros(0, dtype=detectionDtype)
 
-    aspectRatioOutput = outputWidth / outputHeight
-    aspectRatioFrame = w / h
+# Output of trackBall for one frame; overlays are drawn later by overlay.renderOverlay
+class DetectionResult:
+    def __init__(self, frame, detections, ballDetected, rimDetected, shotMadeDetected, ballPosition, ballRadius,
+                 estimatedPosition):
+        self.frame = frame                      # Raw display frame, never drawn into
+        self.detections = detections            # Structured array of every detection (display coordinates)
+        self.ballDetected = ballDetected
+        self.rimDetected = rimDetected
+        self.shotMadeDetected = shotMadeDetected
+        self.ballPosition = ballPosition        # (x, y) of the ball used for tracking, or None
+        self.ballRadius = ballRadius
+        self.estimatedPosition = estimatedPosition  # (x, y) of the EKF state estimate
+        self.rendered = {}                      # Annotation style -> annotated copy of frame
 
-    if aspectRatioFrame > aspectRatioOutput:
-        newWidth = int(h * aspectRatioOutput)
-        newHeight = h
-    else:
-        newWidth = w
-        newHeight = int(w / aspectRatioOutput)
+# Backend for every detector, or None to pick the fastest available one.
+# Set to 'int8-static' or 'int8-dynamic' to opt into the quantized CPU detector.
+modelBackend = None
 
-    xStart = (w - newWidth) // 2
-    yStart = (h - newHeight) // 2
-    croppedFrame = frame[yStart:yStart + newHeight, xStart:xStart + newWidth]
+def chooseBackend(weights='v11.pt'):
+    # The configured backend, or the fastest available one (selecting and exporting it now).
+    # Call this before starting worker processes and hand the result to useBackend in each,
+    # so the workers don't all run the selection and export the same model.
+    return modelBackend if modelBackend is not None else backends.selectBackend(weights)
 
-    outputFrame = cv2.resize(croppedFrame, (outputWidth, outputHeight), interpolation=cv2.INTER_AREA)
+def useBackend(backend):
+    # Process pool initializer: load every detector in this process with the given backend
+    global modelBackend
+    modelBackend = backend
 
-    results = model(outputFrame, conf=0.6, batch=10, device='mps')
-    ballDetected = False
-    rimDetected = False
-    shotMadeDetected = False
-    cx, cy, radius = 0, 0, 0
+def loadModel(weights='v11.pt', backend=None):
+    # Build a separate model instance, e.g. for an inference worker that must not share one.
+    # Without an explicit backend the fastest available one is selected (see backends.py).
+    return backends.loadBackend(weights, backend if backend is not None else chooseBackend(weights))
+
+# The shared model is built lazily: startModelLoading loads and warms it up on a background
+# thread so importing this module (and opening the app window) stays fast.
+modelWeights = 'v11.pt'
+model = None
+modelLock = threading.Lock()
+modelReady = threading.Event()
+modelError = None  # Exception from a failed load or warm-up; the model is not retried after one
+modelLoadSeconds = None
+warmupThread = None
+
+def getModel():
+    # Return the shared model, loading it on first use. Raises if loading failed.
+    global model, modelLoadSeconds, modelError
+    with modelLock:
+        if modelError is not None:
+            raise RuntimeError(f"Detector failed to load: {modelError}") from modelError
+        if model is None:
+            start = time.time()
+            try:
+                model = loadModel(modelWeights)
+            except Exception as e:
+                modelError = e
+                raise
+            modelLoadSeconds = time.time() - start
+    return model
+
+def warmUpModel(runs=3, frameSize=(265, 540)):
+    # Load the shared model and run a few dummy inferences so the first real frame is fast
+    global modelError
+    try:
+        detector = getModel()
+        dummy = np.zeros((frameSize[0], frameSize[1], 3), dtype=np.uint8)
+        for _ in range(runs):
+            runInference(dummy, detector)
+    except Exception as e:
+        with modelLock:
+            if modelError is None:
+                modelError = e
+        print(f"Detector failed to load: {modelError}")
+        return
+    modelReady.set()
+
+def startModelLoading(warmupRuns=3):
+    global warmupThread
+    warmupThread = threading.Thread(target=warmUpModel, args=(warmupRuns,), daemon=True)
+    warmupThread.start()
+    return warmupThread
+
+def waitForModel():
+    # Return the shared model once any background warm-up has finished using it.
+    # Raises if loading or warming it up failed.
+    if warmupThread is not None:
+        warmupThread.join()
+    return getModel()
+
+def isModelReady():
+    return modelReady.is_set()
+
+def isModelFailed():
+    return modelError is not None
+
+def runInference(outputFrame, detector=None):
+    # Run the detector on a prepared frame and return its detections as a structured array
+    return runInferenceBatch([outputFrame], detector)[0]
+
+def runInferenceBatch(outputFrames, detector=None):
+    # Run one forward pass over a list of frames and return one detection array per frame.
+    # Person/Shot boxes are filtered out by the model call itself.
+    detector = detector if detector is not None else getModel()
+    results = detector(outputFrames, conf=0.6, classes=trackedClasses, verbose=False)
+    return [toDetections(r.boxes.data.cpu().numpy()) for r in results]
+
+def toDetections(data):
+    # Pack an (n, 6) [x1, y1, x2, y2, conf, cls] array, moved off the device in one transfer
+    detections = np.empty(len(data), dtype=detectionDtype)
+    detections['box'] = data[:, :4]
+    detections['conf'] = data[:, 4]
+    detections['cls'] = data[:, 5]
+    return detections
+
+# Collects frames from any number of callers into micro-batches. A batch is dispatched as soon
+# as it reaches maxBatchSize or the oldest waiting frame has waited maxDelayMs, then the
+# results are scattered back to each caller.
+class BatchingDetector:
+    def __init__(self, detector=None, maxBatchSize=8, maxDelayMs=10):
+        self.detector = detector
+        self.maxBatchSize = max(1, maxBatchSize)
+        self.maxDelay = maxDelayMs / 1000
+        self.pending = []  # (frame, future, arrival time)
+        self.closed = False
+        self.error = None  # Why the detector couldn't be loaded, if it couldn't
+        self.condition = threading.Condition()
 
-    # Variables to store ball measurements
-    ball_measurements = []
+        # Stats
+        self.batchCount = 0
+        self.frameCount = 0
 
-    for r in results:
-        boxes = r.boxes
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
 
-        for box in boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cls = int(box.cls[0])
+    def submit(self, frame):
+        # Queue a frame for the next batch and return a Future for its detections
+        future = Future()
+        with self.condition:
+            if self.closed:
+                future.set_exception(self.error or RuntimeError("BatchingDetector is closed"))
+                return future
+            self.pending.append((frame, future, time.monotonic()))
+            self.condition.notify_all()
+        return future
 
-            if cls == 2 or cls == 4:  # Skip detection for "Person" class
+    def detect(self, frame):
+        # Blocking convenience wrapper with the same result as runInference
+        return self.submit(frame).result()
+
+    def run(self):
+        # Without an explicit detector, batch on the shared model once it has warmed up
+        if self.detector is None:
+            try:
+                self.detector = waitForModel()
+            except Exception as e:
+                # Fail every waiting and future frame instead of leaving callers blocked
+                with self.condition:
+                    self.closed = True
+                    self.error = e
+                    batch, self.pending = self.pending, []
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                return
+
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                if not self.pending and self.closed:
+                    return
+
+                # Hold the batch open until it fills up or the oldest frame hits its deadline
+                deadline = self.pending[0][2] + self.maxDelay
+                while len(self.pending) < self.maxBatchSize and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                batch = self.pending[:self.maxBatchSize]
+                self.pending = self.pending[self.maxBatchSize:]
+
+            frames = [frame for frame, _, _ in batch]
+            try:
+                batchDetections = runInferenceBatch(frames, self.detector)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
                 continue
 
-            color = None
-            if cls == 0:  # Ball
-                ballDetected = True 
-                cx = int((x1 + x2) / 2)
-                cy = int((y1 + y2) / 2)
-                radius = int(abs(x2 - x1) / 2)
-                ball_measurements.append(np.array([cx, cy]))
-            elif cls == 3:  # Rim
-                rimDetected = True
-                color = (0, 0, 255)
-            elif cls == 1:  # Made Shot
-                shotMadeDetected = True
-                color = (255, 250, 205)
-
-            if color:
-                cv2.rectangle(outputFrame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(outputFrame, detClasses[cls].upper(), (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 2)
+            for (_, future, _), detections in zip(batch, batchDetections):
+                future.set_result(detections)
+            self.batchCount += 1
+            self.frameCount += len(batch)
+
+    def close(self):
+        # Flush whatever is pending and stop the batching thread
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self):
+        return {
+            'batches': self.batchCount,
+            'frames': self.frameCount,
+            'meanBatchSize': self.frameCount / self.batchCount if self.batchCount else 0,
+        }
+
+def trackBall(outputFrame, detections, ekf, measureBall=True):
+    # Update the EKF with the ball measurement and summarize the frame's detections. Nothing
+    # is drawn here; see overlay.renderOverlay. Must be called in frame order since the EKF
+    # is stateful. With measureBall=False (reused detections from an earlier frame) the EKF
+    # only predicts forward.
+    classes = detections['cls']
+    ballDetected = bool((classes == BALL).any())
+    rimDetected = bool((classes == RIM).any())
+    shotMadeDetected = bool((classes == MADE_SHOT).any())
+    cx, cy, radius = 0, 0, 0
 
     # Prediction Step
     ekf.predict()
 
-    if ball_measurements:
-        # If multiple ball detections, choose the one with the highest confidence or closest to previous position
-        z = ball_measurements[0]
-        ekf.update(z)
-    else:
-        # If no detection rely on prediction
-        pass
+    ballPosition = None
+    if ballDetected:
+        # If multiple ball detections, choose the one with the highest confidence
+        balls = detections[classes == BALL]
+        x1, y1, x2, y2 = balls['box'][balls['conf'].argmax()].tolist()
+        cx, cy = int((x1 + x2) / 2), int((y1 + y2) / 2)
+        radius = int(abs(x2 - x1) / 2)
+        ballPosition = (cx, cy)
+        if measureBall:
+            ekf.update(np.array([cx, cy]))
 
     # Get current state estimate
     state = ekf.get_state(cx, cy)
     est_x, est_y, __, ___ = state
 
-    cv2.circle(outputFrame, (int(est_x), int(est_y)), radius, (0, 255, 0), 2)
+    return DetectionResult(outputFrame, detections, ballDetected, rimDetected, shotMadeDetected,
+                           ballPosition, radius, (int(est_x), int(est_y)))
+
+# Preprocessors for detectObjects, one per output size (single-threaded use only)
+preprocessors = {}
+
+def detectObjects(frame, outputWidth, outputHeight, ekf):
+    # Detect and track on one camera frame. The result is not drawn; callers that show or
+    # record it render its overlay with overlay.renderOverlay.
+    preprocessor = preprocessors.get((outputWidth, outputHeight))
+    if preprocessor is None:
+        preprocessor = preprocessors[(outputWidth, outputHeight)] = Preprocessor(outputWidth, outputHeight)
 
-    return ballDetected, rimDetected, shotMadeDetected, outputFrame
+    sourceCrop = preprocessor.crop(frame)
+    outputFrame = preprocessor.display(sourceCrop)
+    detections = preprocessor.detect(sourceCrop, runInference)
+    return trackBall(outputFrame, detections, ekf)
@@ -0,0 +1,266 @@
+import argparse
+import csv
+import time
+import multiprocessing
+import cv2
+import numpy as np
+from ekf import ExtendedKalmanFilter
+import objectDetection
+import backends
+from frameChannel import FrameChannel, BLOCK
+from pipeline import DetectionPipeline
+from persistence import DetectionPersistence
+from motionGate import MotionGate
+from preprocessing import Preprocessor
+from overlay import ANNOTATION_STYLES, renderOverlay
+
+# Headless analysis of recorded sessions. Runs the same detection, EKF and persistence logic
+# as the live view, but with no UI and no display pacing: frames are decoded and processed as
+# fast as the CPU allows and every frame's result is kept (nothing is dropped). Overlays are
+# only drawn when the frames are recorded to a video file.
+#
+# Usage (from the repository root):
+#   python src/offlineAnalysis.py tests/test1.mp4 --output shots.csv
+#   python src/offlineAnalysis.py session.mp4 --processes 8    (segment-parallel)
+#   python src/offlineAnalysis.py session.mp4 --record annotated.mp4
+
+# Same frame size the live view feeds to the detector (app.camFeedWidth x app.camFeedHeight)
+defaultOutputWidth = 540
+defaultOutputHeight = 265
+
+def analyzeVideo(path, outputWidth=defaultOutputWidth, outputHeight=defaultOutputHeight,
+                 numWorkers=2, workerMode='thread', batchSize=4, roi=False, motionGate=None,
+                 recordPath=None, recordAnnotation='full'):
+    """
+    Process a video file end to end and return (shots, stats). Each shot is a dict with the
+    shot number, the frame index that confirmed it and its time in the video in seconds.
+    If recordPath is set, every display frame is also written there with the given overlay
+    style. Returns (None, None) if the video can't be opened.
+    """
+    results = FrameChannel(32, BLOCK)
+    pipeline = DetectionPipeline(path, outputWidth, outputHeight, results,
+                                 numWorkers=numWorkers, workerMode=workerMode,
+                                 batchSize=batchSize, closeOutput=True, roi=roi,
+                                 motionGate=motionGate)
+    if not pipeline.start():
+        return None, None
+
+    persistence = DetectionPersistence()
+    shots = []
+    frameIndex = 0
+    writer = None
+    if recordPath:
+        writer = cv2.VideoWriter(recordPath, cv2.VideoWriter_fourcc(*'mp4v'), pipeline.fps or 30,
+                                 (outputWidth, outputHeight))
+
+    while True:
+        result = results.get(block=True)
+        if result is None:
+            break
+        if persistence.update(result.ballDetected, result.rimDetected, result.shotMadeDetected):
+            recordShot(shots, frameIndex, pipeline.fps)
+        if writer is not None:
+            writer.write(renderOverlay(result, recordAnnotation))
+        frameIndex += 1
+
+    if writer is not None:
+        writer.release()
+    pipeline.join()
+    return shots, pipeline.stats()
+
+def recordShot(shots, frameIndex, fps):
+    """
+    Append a made shot confirmed at frameIndex to the shot log.
+    """
+    shots.append({
+        'shot': len(shots) + 1,
+        'frame': frameIndex,
+        'time': frameIndex / fps if fps > 0 else 0.0,
+        'made': True,
+    })
+
+
+#|************************| SEGMENT-PARALLEL ANALYSIS |************************|#
+
+# Per-frame detection flags returned by segment workers, one byte per frame
+BALL_FLAG = 1
+RIM_FLAG = 2
+SHOT_MADE_FLAG = 4
+
+# Model owned by each worker process, loaded once by the pool initializer
+workerDetector = None
+
+def initSegmentWorker(threadsPerProcess, backend):
+    # Split the cores between the processes; by default each one's torch would use all of them
+    import torch
+    global workerDetector
+    torch.set_num_threads(threadsPerProcess)
+    workerDetector = objectDetection.loadModel(backend=backend)
+
+def planSegments(frameCount, numSegments):
+    """
+    Split [0, frameCount) into contiguous ranges, as a list of (start, end). The last segment
+    has end None and reads to the end of the file, in case the reported frame count is short.
+    """
+    numSegments = max(1, min(numSegments, frameCount))
+    bounds = [frameCount * i // numSegments for i in range(numSegments)] + [None]
+    return [(bounds[i], bounds[i + 1]) for i in range(numSegments)]
+
+def analyzeSegment(task):
+    """
+    Worker: decode and detect one segment with its own model. Returns the segment's start
+    frame and one byte of detection flags per frame it decoded.
+    """
+    path, start, end, outputWidth, outputHeight = task
+    cam = cv2.VideoCapture(path)
+    fps = cam.get(cv2.CAP_PROP_FPS)
+    cam.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    # The EKF only feeds the overlay here; the detection flags don't depend on it
+    ekf = ExtendedKalmanFilter(dt=fps, process_noise_std=1.0, measurement_noise_std=10.0)
+    preprocessor = Preprocessor(outputWidth, outputHeight)
+    infer = lambda modelInput: objectDetection.runInference(modelInput, workerDetector)
+    flags = bytearray()
+
+    frameIndex = start
+    while end is None or frameIndex < end:
+        ret, frame = cam.read()
+        if not ret:
+            break
+        sourceFrame = preprocessor.crop(frame)
+        frame = preprocessor.display(sourceFrame)
+        detections = preprocessor.detect(sourceFrame, infer)
+        result = objectDetection.trackBall(frame, detections, ekf)
+        flags.append(BALL_FLAG * result.ballDetected | RIM_FLAG * result.rimDetected |
+                     SHOT_MADE_FLAG * result.shotMadeDetected)
+        frameIndex += 1
+
+    cam.release()
+    return start, np.frombuffer(bytes(flags), dtype=np.uint8)
+
+def mergeSegments(segmentResults, fps):
+    """
+    Stitch segment results back into one shot log. The per-frame flags of all segments are
+    replayed in order through the same persistence rules as takeStep, so the debounce
+    counters carry across segment boundaries exactly as in a serial run and no segment needs
+    a warm-up window.
+    """
+    persistence = DetectionPersistence()
+    shots = []
+    for start, flags in sorted(segmentResults, key=lambda result: result[0]):
+        for offset, flag in enumerate(flags.tolist()):
+            if persistence.update(flag & BALL_FLAG, flag & RIM_FLAG, flag & SHOT_MADE_FLAG):
+                recordShot(shots, start + offset, fps)
+    return shots
+
+def analyzeVideoParallel(path, numProcesses=None, numSegments=None,
+                         outputWidth=defaultOutputWidth, outputHeight=defaultOutputHeight):
+    """
+    Process a long video as time segments spread over a process pool, then merge the segments
+    into one shot log. Falls back to analyzeVideo if the container doesn't report a frame
+    count. Returns (shots, stats), or (None, None) if the video can't be opened.
+    """
+    cam = cv2.VideoCapture(path)
+    if not cam.isOpened():
+        print("Error: Could not open video.")
+        return None, None
+    fps = cam.get(cv2.CAP_PROP_FPS)
+    frameCount = int(cam.get(cv2.CAP_PROP_FRAME_COUNT))
+    cam.release()
+    if frameCount <= 0:
+        # Some containers don't store a frame count, so the video can't be split up front
+        print("Video reports no frame count; analyzing it in a single process instead")
+        return analyzeVideo(path, outputWidth, outputHeight)
+
+    numProcesses = numProcesses or multiprocessing.cpu_count()
+    numSegments = numSegments or numProcesses
+    segments = planSegments(frameCount, numSegments)
+    tasks = [(path, start, end, outputWidth, outputHeight) for start, end in segments]
+
+    startTime = time.time()
+    # Select (and export) the backend once here rather than in every worker
+    backend = objectDetection.chooseBackend()
+    threadsPerProcess = max(1, multiprocessing.cpu_count() // numProcesses)
+    with multiprocessing.Pool(numProcesses, initializer=initSegmentWorker,
+                              initargs=(threadsPerProcess, backend)) as pool:
+        segmentResults = pool.map(analyzeSegment, tasks, chunksize=1)
+    elapsed = time.time() - startTime
+
+    shots = mergeSegments(segmentResults, fps)
+    processed = sum(len(flags) for _, flags in segmentResults)
+    if processed != frameCount:
+        print(f"Video reported {frameCount} frames but {processed} were decoded")
+    stats = {
+        'processes': numProcesses,
+        'segments': len(segments),
+        'reportedFrames': frameCount,
+        'processed': processed,
+        'fps': processed / elapsed if elapsed > 0 else 0,
+    }
+    return shots, stats
+
+def writeShotLog(shots, path):
+    """
+    Write the shot log as CSV.
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['shot', 'frame', 'time', 'made'])
+        writer.writeheader()
+        writer.writerows(shots)
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a recorded session without the UI.")
+    parser.add_argument('video', nargs='?', default='tests/test1.mp4', help="path to the video file")
+    parser.add_argument('--output', help="write the shot log to this CSV file")
+    parser.add_argument('--workers', type=int, default=2, help="number of inference workers")
+    parser.add_argument('--worker-mode', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--batch-size', type=int, default=4,
+                        help="micro-batch size for thread workers, 1 to disable batching")
+    parser.add_argument('--backend', choices=backends.BACKENDS + backends.QUANTIZED_BACKENDS,
+                        help="detector backend; by default the fastest validated one is picked")
+    parser.add_argument('--roi', action='store_true', help="run inference on a crop around the locked rim")
+    parser.add_argument('--motion-gate', action='store_true', help="skip inference on static frames")
+    parser.add_argument('--gate-threshold', type=int, default=20, help="grey-level change counted as motion")
+    parser.add_argument('--gate-fraction', type=float, default=0.003, help="fraction of moving pixels counted as motion")
+    parser.add_argument('--gate-max-skip', type=int, default=15,
+                        help="force inference after this many consecutive gated frames")
+    parser.add_argument('--processes', type=int, default=1,
+                        help="split the video into segments processed by this many processes")
+    parser.add_argument('--record', help="write the display frames to this video file")
+    parser.add_argument('--record-annotation', choices=ANNOTATION_STYLES, default='full',
+                        help="overlay drawn on recorded frames")
+    args = parser.parse_args()
+    objectDetection.modelBackend = args.backend
+
+    startTime = time.time()
+    if args.processes > 1:
+        if args.record:
+            print("--record is ignored with --processes")
+        shots, stats = analyzeVideoParallel(args.video, numProcesses=args.processes)
+    else:
+        shots, stats = analyzeVideo(args.video, numWorkers=args.workers,
+                                    workerMode=args.worker_mode, batchSize=args.batch_size, roi=args.roi,
+                                    motionGate=MotionGate(pixelThreshold=args.gate_threshold,
+                                                          motionFraction=args.gate_fraction,
+                                                          maxSkipFrames=args.gate_max_skip) if args.motion_gate else None,
+                                    recordPath=args.record, recordAnnotation=args.record_annotation)
+    if shots is None:
+        return
+    elapsed = time.time() - startTime
+
+    for shot in shots:
+        print(f"SHOT {shot['shot']}: made at {shot['time']:.2f}s (frame {shot['frame']})")
+
+    if args.output:
+        writeShotLog(shots, args.output)
+        print(f"Shot log written to {args.output}")
+
+    print(f"Processed {stats['processed']} frames in {elapsed:.1f}s "
+          f"({stats['processed'] / elapsed if elapsed > 0 else 0:.1f} frames/sec), {len(shots)} made shots")
+    if stats.get('motionGate'):
+        gate = stats['motionGate']
+        print(f"Motion gate: {gate['gated']} gated / {gate['inferred']} inferred "
+              f"({gate['gatedRatio'] * 100:.0f}% of frames skipped inference)")
+
+if __name__ == "__main__":
+    main()
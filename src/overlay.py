@@ -0,0 +1,38 @@
+import cv2
+from objectDetection import detClasses, MADE_SHOT, RIM
+
+# Detection overlays, drawn separately from detection and only for frames that will actually
+# be shown or written. Each output picks its own annotation style:
+#   'full'  - rim/made-shot boxes with labels and the tracked ball
+#   'boxes' - boxes and the tracked ball, no text
+#   'none'  - the raw frame
+ANNOTATION_STYLES = ('full', 'boxes', 'none')
+
+boxColors = {RIM: (0, 0, 255), MADE_SHOT: (255, 250, 205)}
+
+def renderOverlay(result, style='full'):
+    """
+    Return the DetectionResult's frame with the given overlay style. Each style is drawn into
+    its own copy, once per result, so outputs with different styles don't see each other's
+    overlays; 'none' returns the raw frame, which is never drawn into.
+    """
+    if style not in ANNOTATION_STYLES:
+        raise ValueError(f"Unknown annotation style '{style}', expected one of {ANNOTATION_STYLES}")
+    if style == 'none':
+        return result.frame
+    if style in result.rendered:
+        return result.rendered[style]
+
+    frame = result.frame.copy()
+    detections = result.detections
+    for cls, color in boxColors.items():
+        for x1, y1, x2, y2 in detections['box'][detections['cls'] == cls].astype(int).tolist():
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            if style == 'full':
+                cv2.putText(frame, detClasses[cls].upper(), (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 2)
+
+    cv2.circle(frame, result.estimatedPosition, result.ballRadius, (0, 255, 0), 2)
+
+    result.rendered[style] = frame
+    return frame
@@ -0,0 +1,42 @@
+# Debounces raw per-frame detections into stable ball/rim/made-shot states.
+# A made shot is only confirmed once the made-shot class has been absent for longer than its
+# persistence threshold, so one make spanning many frames counts once.
+class DetectionPersistence:
+    def __init__(self, ballThreshold=40, rimThreshold=20, shotMadeThreshold=20):
+        self.ballDetectionPersistenceThreshold = ballThreshold
+        self.rimDetectionPersistenceThreshold = rimThreshold
+        self.shotMadePersistenceThreshold = shotMadeThreshold
+
+        self.ballDetectionCounter = ballThreshold
+        self.rimDetectionCounter = rimThreshold
+        self.shotMadeDetectionCounter = shotMadeThreshold
+
+        self.ballStatus = False
+        self.rimStatus = False
+        self.shotMade = False
+
+    def update(self, ballDetected, rimDetected, shotMadeDetected):
+        # Apply one frame's detections. Returns True if this frame confirms a made shot.
+        shotConfirmed = False
+
+        # Update ball detection persistence
+        self.ballDetectionCounter = 0 if ballDetected else self.ballDetectionCounter + 1
+
+        # Update rim detection persistence
+        self.rimDetectionCounter = 0 if rimDetected else self.rimDetectionCounter + 1
+
+        # Check if shot made is detected
+        if shotMadeDetected:
+            # Confirm shot made only if we were previously above persistence threshold
+            if self.shotMadeDetectionCounter > self.shotMadePersistenceThreshold:
+                self.shotMadeDetectionCounter = 0
+                shotConfirmed = True
+        else:
+            self.shotMadeDetectionCounter += 1
+
+        # Set boolean states based on counters
+        self.ballStatus = self.ballDetectionCounter < self.ballDetectionPersistenceThreshold
+        self.rimStatus = self.rimDetectionCounter < self.rimDetectionPersistenceThreshold
+        self.shotMade = self.shotMadeDetectionCounter < self.shotMadePersistenceThreshold
+
+        return shotConfirmed
@@ -0,0 +1,229 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from ekf import ExtendedKalmanFilter
+from frameChannel import FrameChannel, BLOCK
+import objectDetection
+from regionOfInterest import RimRoi
+from preprocessing import Preprocessor
+
+# Staged detection pipeline:
+#   capture thread -> N inference workers -> in-order EKF stage -> output channel
+# Overlays are not drawn here; consumers render them only for frames they show or record.
+# Every captured frame gets a sequence number. Workers may finish out of order, so the last
+# stage holds results in a reorder buffer and only releases them in sequence, keeping the
+# stateful EKF fed in frame order.
+
+class DetectionPipeline:
+    def __init__(self, source, outputWidth, outputHeight, output,
+                 numWorkers=2, workerMode='thread', queueSize=8, batchSize=4, batchDelayMs=10,
+                 closeOutput=False, roi=False, motionGate=None):
+        if workerMode not in ('thread', 'process'):
+            raise ValueError(f"Unknown worker mode '{workerMode}', expected 'thread' or 'process'")
+
+        self.source = source
+        self.outputWidth = outputWidth
+        self.outputHeight = outputHeight
+        self.output = output            # Channel that receives a DetectionResult per frame
+        self.closeOutput = closeOutput  # Close the output channel once the source is exhausted
+        self.roi = RimRoi(outputWidth, outputHeight) if roi else None  # Rim-anchored crops once the rim is locked
+        self.motionGate = motionGate    # Optional MotionGate; static frames skip inference
+        self.numWorkers = max(1, numWorkers)
+        self.workerMode = workerMode
+        self.batchSize = batchSize      # >1 makes thread workers share one micro-batching detector
+        self.batchDelayMs = batchDelayMs
+        if workerMode == 'thread' and batchSize > 1:
+            # A worker waits for its own frame's detections, so a batch never holds more frames
+            # than there are workers. Feeding the batcher only takes a thread per frame in
+            # flight, so run at least one per batch slot.
+            self.numWorkers = max(self.numWorkers, batchSize)
+            queueSize = max(queueSize, batchSize)
+
+        # Bounded, sequence-numbered queues between the stages. Blocking keeps every
+        # sequence number flowing through so the reorder buffer never waits on a gap.
+        self.frameChannel = FrameChannel(queueSize, BLOCK)
+        self.resultChannel = FrameChannel(queueSize, BLOCK)
+
+        self.running = False
+        self.fps = 0
+        self.threads = []
+        self.processPool = None
+        self.batcher = None
+        self.workersLeft = 0
+        self.workersLock = threading.Lock()
+
+        # Stats
+        self.framesCaptured = 0
+        self.framesProcessed = 0
+        self.maxReorderDepth = 0
+        self.startTime = None
+        self.endTime = None
+
+    def start(self):
+        # Open the source and spin up all stages. Returns False if the source can't be opened.
+        cam = cv2.VideoCapture(self.source)
+        if not cam.isOpened():
+            print("Error: Could not open video.")
+            return False
+
+        self.fps = cam.get(cv2.CAP_PROP_FPS)
+        ekf = ExtendedKalmanFilter(dt=self.fps, process_noise_std=1.0, measurement_noise_std=10.0)
+
+        if self.workerMode == 'process':
+            self.processPool = ProcessPoolExecutor(max_workers=self.numWorkers, initializer=objectDetection.useBackend,
+                                                   initargs=(objectDetection.chooseBackend(),))
+        elif self.batchSize > 1:
+            self.batcher = objectDetection.BatchingDetector(None, self.batchSize, self.batchDelayMs)
+
+        self.running = True
+        self.startTime = time.time()
+        self.workersLeft = self.numWorkers
+        self.threads = [threading.Thread(target=self.captureStage, args=(cam,), daemon=True)]
+        for workerIndex in range(self.numWorkers):
+            self.threads.append(threading.Thread(target=self.inferenceStage, args=(workerIndex,), daemon=True))
+        self.threads.append(threading.Thread(target=self.annotateStage, args=(ekf,), daemon=True))
+
+        for thread in self.threads:
+            thread.start()
+        return True
+
+    def stop(self):
+        # Ask every stage to wind down; queued frames are discarded
+        self.running = False
+        self.frameChannel.close()
+        self.resultChannel.close()
+        if self.processPool is not None:
+            self.processPool.shutdown(wait=False, cancel_futures=True)
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def captureStage(self, cam):
+        # Read frames as fast as the source delivers them and tag each with a sequence number.
+        # The detector works on the full-resolution crop; the display frame is made separately.
+        preprocessor = Preprocessor(self.outputWidth, self.outputHeight)
+        seq = 0
+        while self.running:
+            ret, frame = cam.read()
+            if not ret:
+                break
+            sourceFrame = preprocessor.crop(frame)
+            frame = preprocessor.display(sourceFrame)
+            # The gate compares consecutive frames, so it runs here where frames are still in order
+            shouldInfer = self.motionGate.shouldInfer(frame) if self.motionGate is not None else True
+            if not self.frameChannel.put((seq, frame, sourceFrame, shouldInfer)):
+                break
+            seq += 1
+            self.framesCaptured += 1
+
+        cam.release()
+        self.frameChannel.close()
+
+    def inferenceStage(self, workerIndex):
+        # Worker: pull frames in any order, run the detector and pass results on.
+        # Thread workers own a model instance each since a YOLO predictor isn't thread-safe,
+        # unless they all feed the shared batching detector. The first worker takes over the
+        # shared, already warmed-up model.
+        detector = None
+        if self.workerMode == 'thread' and self.batcher is None:
+            try:
+                detector = objectDetection.waitForModel() if workerIndex == 0 else objectDetection.loadModel()
+            except Exception as e:
+                # Without a detector nothing downstream can make progress
+                print(f"Inference worker {workerIndex} has no detector: {e}")
+                self.stop()
+        # Each worker letterboxes into its own reused model-input buffers
+        preprocessor = Preprocessor(self.outputWidth, self.outputHeight)
+        runDetector = lambda modelInput: self.detect(modelInput, detector)
+
+        while self.running:
+            item = self.frameChannel.get(block=True)
+            if item is None:
+                break
+            seq, frame, sourceFrame, shouldInfer = item
+            if not shouldInfer:
+                # Static frame: the annotate stage reuses the previous result
+                if not self.resultChannel.put((seq, frame, None)):
+                    break
+                continue
+            try:
+                region = self.roi.plan(seq) if self.roi is not None else None
+                detections = preprocessor.detect(sourceFrame, runDetector, region)
+            except Exception as e:
+                # Still emit the sequence number so the reorder buffer can advance
+                print(f"Inference failed on frame {seq}: {e}")
+                detections = objectDetection.emptyDetections
+            if not self.resultChannel.put((seq, frame, detections)):
+                break
+
+        # Last worker out closes the result channel
+        with self.workersLock:
+            self.workersLeft -= 1
+            if self.workersLeft == 0:
+                self.resultChannel.close()
+
+    def detect(self, frame, detector):
+        # Run one frame through whichever inference path this pipeline uses
+        if self.processPool is not None:
+            return self.processPool.submit(objectDetection.runInference, frame).result()
+        if self.batcher is not None:
+            return self.batcher.detect(frame)
+        return objectDetection.runInference(frame, detector)
+
+    def annotateStage(self, ekf):
+        # Single in-order stage: release results by sequence number through the EKF
+        reorderBuffer = {}
+        nextSeq = 0
+        # What gated frames reuse: the last detections without the made-shot and ball boxes, so a
+        # make isn't held through a static stretch and the EKF predicts without a measurement
+        staleDetections = objectDetection.emptyDetections
+
+        while True:
+            item = self.resultChannel.get(block=True)
+            if item is None:
+                break
+            seq, frame, detections = item
+            reorderBuffer[seq] = (frame, detections)
+            self.maxReorderDepth = max(self.maxReorderDepth, len(reorderBuffer))
+
+            while nextSeq in reorderBuffer:
+                frame, detections = reorderBuffer.pop(nextSeq)
+                if detections is None:
+                    # Gated frame: reuse the last rim boxes and let the EKF predict forward
+                    result = objectDetection.trackBall(frame, staleDetections, ekf, measureBall=False)
+                else:
+                    result = objectDetection.trackBall(frame, detections, ekf)
+                    if self.roi is not None:
+                        self.roi.observe(detections, ekf, result.ballDetected)
+                    classes = detections['cls']
+                    staleDetections = detections[(classes != objectDetection.MADE_SHOT) & (classes != objectDetection.BALL)]
+                self.output.put(result)
+                self.framesProcessed += 1
+                nextSeq += 1
+
+        self.endTime = time.time()
+        self.running = False
+        if self.closeOutput:
+            self.output.close()
+
+    def stats(self):
+        # Snapshot of throughput and queue state for each stage
+        endTime = self.endTime if self.endTime is not None else time.time()
+        elapsed = endTime - self.startTime if self.startTime is not None else 0
+        return {
+            'workers': self.numWorkers,
+            'workerMode': self.workerMode,
+            'captured': self.framesCaptured,
+            'processed': self.framesProcessed,
+            'fps': self.framesProcessed / elapsed if elapsed > 0 else 0,
+            'maxReorderDepth': self.maxReorderDepth,
+            'batching': self.batcher.stats() if self.batcher is not None else None,
+            'roi': self.roi.stats() if self.roi is not None else None,
+            'motionGate': self.motionGate.stats() if self.motionGate is not None else None,
+            'frameQueue': self.frameChannel.stats(),
+            'resultQueue': self.resultChannel.stats(),
+        }
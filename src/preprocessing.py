@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+from regionOfInterest import cropRegion, mapDetectionsFromRegion
+
+# Single preprocessing path for camera frames. The center crop and letterbox geometry are
+# computed once per source resolution and cached, and the model input is written straight
+# into a reused buffer. The detector sees the full-resolution crop (letterboxed once, to a size
+# the model accepts without resizing again), while the display frame is produced separately at
+# screen size. Detections come back in display-frame coordinates.
+#
+# A Preprocessor owns its input buffers, so each inference thread needs its own instance.
+
+class Preprocessor:
+    def __init__(self, outputWidth, outputHeight, imgsz=640, stride=32, padValue=114):
+        self.outputWidth = outputWidth
+        self.outputHeight = outputHeight
+        self.imgsz = imgsz          # Longest side of the model input
+        self.stride = stride        # Model input sides are padded to a multiple of this
+        self.padValue = padValue
+        self.cropCache = {}         # (h, w) -> (xStart, yStart, width, height)
+        self.letterboxCache = {}    # (h, w) -> (buffer, resized view, scale, padX, padY)
+
+    def cropGeometry(self, h, w):
+        geometry = self.cropCache.get((h, w))
+        if geometry is None:
+            aspectRatioOutput = self.outputWidth / self.outputHeight
+            if w / h > aspectRatioOutput:
+                newWidth, newHeight = int(h * aspectRatioOutput), h
+            else:
+                newWidth, newHeight = w, int(w / aspectRatioOutput)
+            geometry = ((w - newWidth) // 2, (h - newHeight) // 2, newWidth, newHeight)
+            self.cropCache[(h, w)] = geometry
+        return geometry
+
+    def crop(self, frame):
+        # Centered crop with the display aspect ratio, as a view at source resolution
+        xStart, yStart, width, height = self.cropGeometry(*frame.shape[:2])
+        return frame[yStart:yStart + height, xStart:xStart + width]
+
+    def display(self, sourceCrop):
+        # Screen-size frame for drawing; a fresh array since it is handed to other threads
+        return cv2.resize(sourceCrop, (self.outputWidth, self.outputHeight), interpolation=cv2.INTER_AREA)
+
+    def letterboxGeometry(self, h, w):
+        entry = self.letterboxCache.get((h, w))
+        if entry is None:
+            if len(self.letterboxCache) >= 16:
+                # ROI crops vary in size; keep the cache from growing without bound
+                self.letterboxCache.clear()
+            scale = self.imgsz / max(h, w)
+            resizedW, resizedH = max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+            inputW = -(-resizedW // self.stride) * self.stride
+            inputH = -(-resizedH // self.stride) * self.stride
+            padX, padY = (inputW - resizedW) // 2, (inputH - resizedH) // 2
+
+            buffer = np.full((inputH, inputW, 3), self.padValue, dtype=np.uint8)
+            resizedView = buffer[padY:padY + resizedH, padX:padX + resizedW]
+            entry = (buffer, resizedView, scale, padX, padY)
+            self.letterboxCache[(h, w)] = entry
+        return entry
+
+    def letterbox(self, image):
+        """
+        Resize an image into the reused model-input buffer. Returns the buffer and the
+        (scale, padX, padY) needed to map boxes back. The buffer is overwritten by the next
+        call with the same image size.
+        """
+        buffer, resizedView, scale, padX, padY = self.letterboxGeometry(*image.shape[:2])
+        resized = cv2.resize(image, (resizedView.shape[1], resizedView.shape[0]), dst=resizedView,
+                             interpolation=cv2.INTER_LINEAR)
+        if not np.shares_memory(resized, buffer):
+            # OpenCV allocated its own output (e.g. for an unusual source layout)
+            resizedView[...] = resized
+        return buffer, (scale, padX, padY)
+
+    def detect(self, sourceCrop, infer, region=None):
+        """
+        Run infer (model input -> detections) on the whole source crop, or on a display-space
+        region of it, and return detections in display-frame coordinates.
+        """
+        cropScale = sourceCrop.shape[1] / self.outputWidth
+        image = sourceCrop if region is None else cropRegion(sourceCrop, region, cropScale)
+        modelInput, (scale, padX, padY) = self.letterbox(image)
+
+        detections = infer(modelInput)
+        detections['box'] = (detections['box'] - (padX, padY, padX, padY)) / scale
+        return mapDetectionsFromRegion(detections, region if region is not None else (0, 0), cropScale)
@@ -0,0 +1,174 @@
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+import backends
+from objectDetection import BALL, MADE_SHOT, RIM
+from persistence import DetectionPersistence
+
+# Opt-in INT8 detector for CPU hosts. The ONNX export of the weights is quantized with
+# ONNX Runtime, either dynamically (weights only) or statically with activation ranges
+# calibrated on frames sampled from our own session videos.
+#
+# Build the model and compare it against full precision (from the repository root):
+#   python src/quantization.py --mode static --video tests/test1.mp4
+
+QUANTIZATION_MODES = ('dynamic', 'static')
+
+# Classes the app acts on, and the names used in the accuracy report
+reportClasses = {BALL: 'ball', RIM: 'rim', MADE_SHOT: 'madeShot'}
+
+def quantizedPath(weights, mode):
+    stem, _ = os.path.splitext(weights)
+    return f"{stem}.int8-{mode}.onnx"
+
+def inputTensor(modelInput):
+    # A Preprocessor.letterbox model input (BGR, HWC, uint8) in the exported model's layout:
+    # a batch of one, RGB, CHW, float in [0, 1]. No resizing, so calibration sees exactly
+    # the geometry the runtime feeds.
+    return np.ascontiguousarray(modelInput[:, :, ::-1].transpose(2, 0, 1))[None].astype(np.float32) / 255
+
+def calibrationReader(onnxPath, frames):
+    # Feeds calibration frames (model inputs from backends.sampleFrames) to ONNX Runtime's
+    # static quantizer
+    import onnxruntime
+    from onnxruntime.quantization import CalibrationDataReader
+
+    session = onnxruntime.InferenceSession(onnxPath, providers=['CPUExecutionProvider'])
+    inputName = session.get_inputs()[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = iter([{inputName: inputTensor(frame)} for frame in frames])
+
+        def get_next(self):
+            return next(self.batches, None)
+
+    return FrameReader()
+
+def buildQuantizedModel(weights, mode='static', calibrationVideo='tests/test1.mp4', calibrationFrames=64):
+    """
+    Quantize the ONNX export of the weights to INT8 and return the model path. The result is
+    cached next to the weights and rebuilt only when the weights are newer.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+
+    path = quantizedPath(weights, mode)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(weights):
+        return path
+
+    onnxPath = backends.exportModel(weights, 'onnx')
+    print(f"Quantizing {onnxPath} ({mode})...")
+    if mode == 'dynamic':
+        quantize_dynamic(onnxPath, path, weight_type=QuantType.QUInt8)
+    else:
+        frames = backends.sampleFrames(calibrationVideo, calibrationFrames)
+        quantize_static(onnxPath, path, calibrationReader(onnxPath, frames),
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    return path
+
+def loadQuantized(weights, mode='static'):
+    """
+    Load the INT8 detector, building it first if needed.
+    """
+    from ultralytics import YOLO
+    return backends.Detector(YOLO(buildQuantizedModel(weights, mode), task='detect'), f"int8-{mode}", 'cpu')
+
+def readFrames(path, maxFrames, outputWidth=540, outputHeight=265):
+    # Consecutive model inputs from the start of a video, so made shots can be confirmed as in takeStep
+    from preprocessing import Preprocessor
+
+    preprocessor = Preprocessor(outputWidth, outputHeight)
+    cam = cv2.VideoCapture(path)
+    frames = []
+    while maxFrames is None or len(frames) < maxFrames:
+        ret, frame = cam.read()
+        if not ret:
+            break
+        frames.append(preprocessor.letterbox(preprocessor.crop(frame))[0].copy())
+    cam.release()
+    return frames
+
+def countMadeShots(frameDetections):
+    persistence = DetectionPersistence()
+    madeShots = 0
+    for detections in frameDetections:
+        classes = detections['cls']
+        madeShots += persistence.update((classes == BALL).any(), (classes == RIM).any(), (classes == MADE_SHOT).any())
+    return madeShots
+
+def accuracyReport(weights, mode, frames, minIou=0.5):
+    """
+    Compare the INT8 detector against full precision on the same frames. For each class the
+    report has the frames where each model saw it, the quantized model's recall and precision
+    against full precision, and the mean IoU of matched boxes. It also has per-frame latency
+    and made shots confirmed by the persistence rules.
+    """
+    from objectDetection import runInference
+
+    reference = backends.loadBackend(weights, 'torch')
+    quantized = loadQuantized(weights, mode)
+
+    def timedRun(detector):
+        start = time.perf_counter()
+        detections = [runInference(frame, detector) for frame in frames]
+        return detections, (time.perf_counter() - start) / max(1, len(frames)) * 1000
+
+    referenceDetections, referenceLatency = timedRun(reference)
+    quantizedDetections, quantizedLatency = timedRun(quantized)
+
+    report = {
+        'frames': len(frames),
+        'latencyMs': {'fp32': referenceLatency, 'int8': quantizedLatency},
+        'madeShots': {'fp32': countMadeShots(referenceDetections), 'int8': countMadeShots(quantizedDetections)},
+    }
+    for cls, name in reportClasses.items():
+        both = onlyReference = onlyQuantized = 0
+        ious = []
+        for expected, actual in zip(referenceDetections, quantizedDetections):
+            expectedBoxes = expected['box'][expected['cls'] == cls].tolist()
+            actualBoxes = actual['box'][actual['cls'] == cls].tolist()
+            if expectedBoxes and actualBoxes:
+                both += 1
+                ious.extend(max(backends.boxIou(box, other) for other in actualBoxes) for box in expectedBoxes)
+            elif expectedBoxes:
+                onlyReference += 1
+            elif actualBoxes:
+                onlyQuantized += 1
+        report[name] = {
+            'fp32Frames': both + onlyReference,
+            'int8Frames': both + onlyQuantized,
+            'recall': both / (both + onlyReference) if both + onlyReference else 1.0,
+            'precision': both / (both + onlyQuantized) if both + onlyQuantized else 1.0,
+            'meanIou': float(np.mean(ious)) if ious else None,
+            'boxesAboveIou': sum(iou >= minIou for iou in ious),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an INT8 detector and report its accuracy against full precision.")
+    parser.add_argument('--weights', default='v11.pt')
+    parser.add_argument('--mode', choices=QUANTIZATION_MODES, default='static')
+    parser.add_argument('--video', default='tests/test1.mp4', help="video used for calibration and evaluation")
+    parser.add_argument('--calibration-frames', type=int, default=64)
+    parser.add_argument('--frames', type=int, default=300, help="evaluate on at most this many frames")
+    args = parser.parse_args()
+
+    buildQuantizedModel(args.weights, args.mode, args.video, args.calibration_frames)
+    report = accuracyReport(args.weights, args.mode, readFrames(args.video, args.frames))
+
+    print(f"Frames: {report['frames']}")
+    print(f"Latency: {report['latencyMs']['fp32']:.1f} ms fp32, {report['latencyMs']['int8']:.1f} ms int8")
+    print(f"Made shots: {report['madeShots']['fp32']} fp32, {report['madeShots']['int8']} int8")
+    for name in reportClasses.values():
+        result = report[name]
+        meanIou = f"{result['meanIou']:.2f}" if result['meanIou'] is not None else "n/a"
+        print(f"{name:>9}: seen in {result['fp32Frames']} fp32 / {result['int8Frames']} int8 frames, "
+              f"recall {result['recall'] * 100:.1f}%, precision {result['precision'] * 100:.1f}%, mean IoU {meanIou}")
+
+if __name__ == "__main__":
+    main()
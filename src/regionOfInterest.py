@@ -0,0 +1,115 @@
+import threading
+import numpy as np
+
+# Rim-anchored region of interest. The camera is fixed and the rim barely moves, so once the
+# rim has been seen for a few frames in a row it is "locked" and inference can run on a padded
+# crop around it (plus the ball's predicted path) instead of the whole frame. The crop is taken
+# from the full-resolution camera frame, so the model sees the small ball at a higher effective
+# resolution. A periodic full-frame pass re-acquires the rim and anything outside the crop.
+#
+# All boxes here are in display-frame coordinates (outputWidth x outputHeight).
+
+class RimRoi:
+    def __init__(self, outputWidth, outputHeight, rimPadding=2.5, ballMargin=40, minSize=160,
+                 lockFrames=5, maxMissedFrames=15, refreshInterval=30):
+        self.outputWidth = outputWidth
+        self.outputHeight = outputHeight
+        self.rimPadding = rimPadding            # Crop extends this many rim widths/heights around the rim
+        self.ballMargin = ballMargin            # Padding around the ball's current and predicted position
+        self.minSize = minSize                  # Smallest crop side, in display pixels
+        self.lockFrames = lockFrames            # Consecutive rim detections needed to lock
+        self.maxMissedFrames = maxMissedFrames  # Rim-less frames before the lock is dropped
+        self.refreshInterval = refreshInterval  # Every Nth frame runs on the full frame
+
+        self.lock = threading.Lock()
+        self.rimBox = None
+        self.rimHits = 0
+        self.rimMisses = 0
+        self.locked = False
+        self.ballPath = None  # (x0, y0, x1, y1) around the ball's current and predicted position
+
+        # Stats
+        self.roiFrames = 0
+        self.fullFrames = 0
+        self.roiAreaTotal = 0.0
+
+    def plan(self, seq):
+        """
+        Region to run inference on for frame seq, or None for a full-frame pass.
+        """
+        with self.lock:
+            if not self.locked or seq % self.refreshInterval == 0:
+                self.fullFrames += 1
+                return None
+
+            x0, y0, x1, y1 = self.rimBox
+            padX = max((x1 - x0) * self.rimPadding, self.minSize / 2)
+            padY = max((y1 - y0) * self.rimPadding, self.minSize / 2)
+            region = [x0 - padX, y0 - padY, x1 + padX, y1 + padY]
+
+            if self.ballPath is not None:
+                region = [min(region[0], self.ballPath[0]), min(region[1], self.ballPath[1]),
+                          max(region[2], self.ballPath[2]), max(region[3], self.ballPath[3])]
+
+            region = (max(0, int(region[0])), max(0, int(region[1])),
+                      min(self.outputWidth, int(region[2])), min(self.outputHeight, int(region[3])))
+
+            self.roiFrames += 1
+            self.roiAreaTotal += ((region[2] - region[0]) * (region[3] - region[1]) /
+                                  (self.outputWidth * self.outputHeight))
+            return region
+
+    def observe(self, detections, ekf, ballDetected):
+        """
+        Update the rim lock and ball path from one frame's detections, in frame order.
+        """
+        with self.lock:
+            rims = detections['box'][detections['cls'] == 3]
+            if len(rims):
+                # Keep the rim box stable: blend towards the largest new detection
+                areas = (rims[:, 2] - rims[:, 0]) * (rims[:, 3] - rims[:, 1])
+                newBox = rims[areas.argmax()].astype(float)
+                self.rimBox = newBox if self.rimBox is None else 0.8 * self.rimBox + 0.2 * newBox
+                self.rimHits += 1
+                self.rimMisses = 0
+                if self.rimHits >= self.lockFrames:
+                    self.locked = True
+            else:
+                self.rimHits = 0
+                self.rimMisses += 1
+                if self.rimMisses > self.maxMissedFrames:
+                    self.locked = False
+                    self.rimBox = None
+
+            if ballDetected and ekf.is_initialized:
+                current = ekf.x[:2, 0]
+                predicted = (ekf.F @ ekf.x)[:2, 0]
+                low = np.minimum(current, predicted) - self.ballMargin
+                high = np.maximum(current, predicted) + self.ballMargin
+                self.ballPath = (low[0], low[1], high[0], high[1])
+            else:
+                self.ballPath = None
+
+    def stats(self):
+        with self.lock:
+            return {
+                'locked': self.locked,
+                'roiFrames': self.roiFrames,
+                'fullFrames': self.fullFrames,
+                'meanRoiArea': self.roiAreaTotal / self.roiFrames if self.roiFrames else 0,
+            }
+
+def mapDetectionsFromRegion(detections, region, scale):
+    """
+    Map detections from a crop of the source frame back to display-frame coordinates.
+    region is the crop in display coordinates and scale is source pixels per display pixel.
+    """
+    x0, y0 = region[0], region[1]
+    mapped = detections.copy()
+    mapped['box'] = detections['box'] / scale + (x0, y0, x0, y0)
+    return mapped
+
+def cropRegion(sourceFrame, region, scale):
+    # The part of the full-resolution source frame covered by a display-space region
+    x0, y0, x1, y1 = region
+    return sourceFrame[int(y0 * scale):int(y1 * scale), int(x0 * scale):int(x1 * scale)]
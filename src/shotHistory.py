@@ -0,0 +1,168 @@
+import numpy as np
+from fenwick import FenwickTree
+
+# Columnar shot history. Each column is a NumPy array grown by doubling, so appends are
+# amortized O(1) and long sessions stay compact. Indexing and iteration still give
+# (shotNum, made, timestamp, zone) tuples like the old list of shots, while the column
+# properties are zero-copy views for vectorized graph and analytics code.
+#
+# It is also an indexed timeline: a Fenwick tree over the made flags answers makes, attempts
+# and FG% for any range of shots (or of time, since timestamps never decrease) in O(log n),
+# and a past shot's result or zone can be corrected in O(log n) without recomputing running
+# totals. version counts corrections so cached views can tell an edited history apart.
+
+NO_ZONE = 0  # Zone id for shots without a logged location; zones are '1'-'8' in app.courtZones
+ZONE_COUNT = 9
+
+class ShotHistory:
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.columns = {
+            'shotNumber': np.zeros(capacity, dtype=np.int32),
+            'made': np.zeros(capacity, dtype=bool),
+            'timestamp': np.zeros(capacity, dtype=np.float64),
+            'zone': np.zeros(capacity, dtype=np.int8),
+        }
+        self.makesTree = FenwickTree()
+        self.version = 0
+
+        # Per zone id: makes and attempts of the shots logged there
+        self.zoneMakes = np.zeros(ZONE_COUNT, dtype=np.int32)
+        self.zoneAttempts = np.zeros(ZONE_COUNT, dtype=np.int32)
+
+    def grow(self):
+        for name, column in self.columns.items():
+            grown = np.zeros(2 * len(column), dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+
+    def append(self, shot):
+        # Add a (shotNum, made, timestamp, zone) shot
+        shotNumber, made, timestamp, zone = shot
+        if self.count == len(self.columns['shotNumber']):
+            self.grow()
+        i = self.count
+        self.columns['shotNumber'][i] = shotNumber
+        self.columns['made'][i] = made
+        self.columns['timestamp'][i] = timestamp
+        self.columns['zone'][i] = NO_ZONE
+        self.makesTree.append(bool(made))
+        self.count += 1
+        if zone:
+            self.setZone(i, zone)
+
+    def setZone(self, index, zone):
+        # Log, correct or clear (with None) the court zone of a recorded shot
+        index = self.index(index)
+        made = int(self.columns['made'][index])
+        self.countZone(index, -1, -made)
+        self.columns['zone'][index] = int(zone) if zone else NO_ZONE
+        self.countZone(index, 1, made)
+        self.version += 1
+
+    def setMade(self, index, made):
+        # Correct the result of a recorded shot, e.g. a make detected by mistake
+        index = self.index(index)
+        made = bool(made)
+        if made == self.columns['made'][index]:
+            return
+        self.columns['made'][index] = made
+        self.makesTree.set(index, made)
+        self.countZone(index, 0, 1 if made else -1)
+        self.version += 1
+
+    def countZone(self, index, attempts, makes):
+        zone = self.columns['zone'][index]
+        if zone != NO_ZONE:
+            self.zoneAttempts[zone] += attempts
+            self.zoneMakes[zone] += makes
+
+    def index(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("shot index out of range")
+        return index
+
+    def shot(self, i):
+        zone = int(self.columns['zone'][i])
+        return (int(self.columns['shotNumber'][i]), bool(self.columns['made'][i]),
+                float(self.columns['timestamp'][i]), str(zone) if zone != NO_ZONE else None)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.shot(i) for i in range(*index.indices(self.count))]
+        return self.shot(self.index(index))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.shot(i)
+
+    # Zero-copy views of the recorded shots
+
+    @property
+    def shotNumbers(self):
+        return self.columns['shotNumber'][:self.count]
+
+    @property
+    def made(self):
+        return self.columns['made'][:self.count]
+
+    @property
+    def timestamps(self):
+        return self.columns['timestamp'][:self.count]
+
+    @property
+    def zones(self):
+        return self.columns['zone'][:self.count]
+
+    # Range queries over shots [start, end), O(log n)
+
+    def bounds(self, start, end):
+        # Clamp like a slice: negative indices count from the end
+        start, end, _ = slice(start, end).indices(self.count)
+        return start, end
+
+    def makes(self, start=0, end=None):
+        start, end = self.bounds(start, end)
+        return self.makesTree.sum(start, end)
+
+    def attempts(self, start=0, end=None):
+        start, end = self.bounds(start, end)
+        return max(end - start, 0)
+
+    def rangePercentage(self, start=0, end=None):
+        # FG% over a range of shots, 0 if it is empty
+        attempts = self.attempts(start, end)
+        return self.makes(start, end) / attempts * 100 if attempts else 0.0
+
+    def timeRange(self, startTime, endTime):
+        # Shot range [start, end) taken at startTime <= timestamp < endTime
+        return (int(np.searchsorted(self.timestamps, startTime, side='left')),
+                int(np.searchsorted(self.timestamps, endTime, side='left')))
+
+    def zoneStats(self, zone):
+        # (makes, attempts) of the shots logged in a zone ('1'-'8')
+        zone = int(zone)
+        return int(self.zoneMakes[zone]), int(self.zoneAttempts[zone])
+
+    def percentage(self, index):
+        # FG% after one shot
+        index = self.index(index)
+        return self.makes(0, index + 1) / (index + 1) * 100
+
+    @property
+    def cumulativeMakes(self):
+        # Makes up to and including each shot, for vectorized code; O(n)
+        return np.cumsum(self.made, dtype=np.int32)
+
+    def percentages(self):
+        # FG% after each shot
+        return self.cumulativeMakes / np.arange(1, self.count + 1) * 100
+
+    def minutes(self, startTime):
+        # Time of each shot in minutes since startTime
+        return (self.timestamps - startTime) / 60
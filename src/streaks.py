@@ -0,0 +1,115 @@
+from collections import deque
+
+# Incremental hot/cold streak analysis. Each shot updates the current make/miss run, the
+# longest runs so far and, for every tracked window size, a rolling count of makes over the
+# last N shots, all in O(1) per window size. periods() then builds the same (hot, cold) result
+# as a full rescan of the shot history. Corrections to past shots are rare, and rebuild the
+# analyzer with fromHistory.
+#
+# A period is (startTime, endTime, percentage, length, isHot, shotNumbers).
+# tests/test_streaks.py checks it against the full rescan on random shot histories.
+
+class StreakAnalyzer:
+    def __init__(self, windowSizes=(5,)):
+        self.shotNumbers = []
+        self.timestamps = []
+
+        # Runs as (startIndex, length); the longest are the earliest runs of maximal length
+        self.runMade = None
+        self.runStart = 0
+        self.runLength = 0
+        self.longestRuns = {True: None, False: None}
+
+        # Per window size: recent made flags, makes in the window, and the best windows as
+        # (makes, endIndex), the earliest window with the most / fewest makes
+        self.windows = {size: deque(maxlen=size) for size in windowSizes}
+        self.windowMakes = {size: 0 for size in windowSizes}
+        self.hottestWindows = {size: None for size in windowSizes}
+        self.coldestWindows = {size: None for size in windowSizes}
+
+    @classmethod
+    def fromHistory(cls, history, windowSizes=(5,)):
+        # Rebuild from scratch, e.g. after a past shot in the history was corrected. This
+        # replays every shot, O(n); the analyzer itself only supports appending shots.
+        analyzer = cls(windowSizes)
+        for shotNumber, made, timestamp, _ in history:
+            analyzer.add(shotNumber, made, timestamp)
+        return analyzer
+
+    def __len__(self):
+        return len(self.shotNumbers)
+
+    def add(self, shotNumber, made, timestamp):
+        made = bool(made)
+        index = len(self.shotNumbers)
+        self.shotNumbers.append(shotNumber)
+        self.timestamps.append(timestamp)
+
+        # Consecutive streak tracking
+        if self.runMade is None or self.runMade != made:
+            self.runMade, self.runStart, self.runLength = made, index, 1
+        else:
+            self.runLength += 1
+        longest = self.longestRuns[made]
+        if longest is None or self.runLength > longest[1]:
+            self.longestRuns[made] = (self.runStart, self.runLength)
+
+        # Rolling window analysis
+        for size, window in self.windows.items():
+            if len(window) == size:
+                self.windowMakes[size] -= window[0]
+            window.append(made)
+            self.windowMakes[size] += made
+            if len(window) < size:
+                continue
+
+            makes = self.windowMakes[size]
+            hottest = self.hottestWindows[size]
+            if makes >= 3 and (hottest is None or makes > hottest[0]):
+                self.hottestWindows[size] = (makes, index)
+            coldest = self.coldestWindows[size]
+            if size - makes >= 3 and (coldest is None or makes < coldest[0]):
+                self.coldestWindows[size] = (makes, index)
+
+    def makeStreaks(self):
+        """
+        (current, best) make streaks as the live view shows them: the length of the current run
+        of makes (0 after a miss) and of the longest run of makes so far.
+        """
+        current = self.runLength if self.runMade else 0
+        longest = self.longestRuns[True]
+        return current, longest[1] if longest is not None else 0
+
+    def period(self, start, length, percentage, isHot):
+        return (self.timestamps[start], self.timestamps[start + length - 1], percentage, length,
+                isHot, self.shotNumbers[start:start + length])
+
+    def windowPeriod(self, best, size, isHot):
+        if best is None:
+            return None
+        makes, end = best
+        return self.period(end - size + 1, size, (makes / size) * 100, isHot)
+
+    def periods(self, windowSize=5):
+        """
+        Hottest and coldest periods: the best rolling window of windowSize shots (at least 3
+        makes / misses) or the longest consecutive run of 3 or more, whichever ranks higher.
+        """
+        if len(self.shotNumbers) < 3:
+            return None, None
+
+        hotPeriod = self.windowPeriod(self.hottestWindows[windowSize], windowSize, True)
+        longest = self.longestRuns[True]
+        if longest is not None and longest[1] >= 3:
+            consecutiveHot = self.period(longest[0], longest[1], 100.0, True)
+            hotPeriod = consecutiveHot if not hotPeriod else \
+                max([consecutiveHot, hotPeriod], key=lambda x: (x[2], x[3]))
+
+        coldPeriod = self.windowPeriod(self.coldestWindows[windowSize], windowSize, False)
+        longest = self.longestRuns[False]
+        if longest is not None and longest[1] >= 3:
+            consecutiveCold = self.period(longest[0], longest[1], 0.0, False)
+            coldPeriod = consecutiveCold if not coldPeriod else \
+                min([consecutiveCold, coldPeriod], key=lambda x: (x[2], -x[3]))
+
+        return hotPeriod, coldPeriod
@@ -1,8 +1,31 @@
 import math
+import queue
 import random
-from cmu_graphics import drawLine, rgb, drawRect
+import threading
+from collections import deque
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+from cmu_graphics import CMUImage, drawImage, drawLine, rgb, drawRect
 import time
 
+# Glow layers drawn under the white core of each segment: (time offset, saturation, opacity,
+# width multiplier for main bolt, width multiplier for branches, width reduction)
+GLOW_LAYERS = (
+    (0.2, 0.7, 15, 1.2, 0.9, 0),   # Outer glow
+    (0.4, 0.8, 20, 0.8, 0.6, 3),   # Middle glow
+    (0.6, 0.9, 25, 0.6, 0.4, 6),   # Inner glow
+)
+FLASH_COLOR = (0.8, 0.6)  # (time offset, saturation) of the screen-wide flash
+
+# Most shapes all lightning strikes together may draw in one redraw
+DEFAULT_SHAPE_BUDGET = 1500
+
+# Pre-rasterized strikes: each sprite is one strike pattern rendered with its glow at a few
+# reveal stages, so drawing it costs one image per frame instead of one line per layer and segment
+SPRITE_PADDING = 12         # Room around the pattern for the widest glow line and its blur
+SPRITE_STAGES = 6           # Reveal steps rendered per sprite
+SPRITE_POOL_SIZE = 3        # Ready sprites kept per strike
+
 # Represents a single lightning bolt
 class LightningStrike:
     def __init__(self, x, y, max_length, duration, lean_direction):
@@ -15,14 +38,19 @@ class LightningStrike:
         self.start_time = None
         self.active = False
         self.progress = 0.0
-        self.branches = []
+        self.segments = np.zeros((0, 4), dtype=np.float32)  # (x1, y1, x2, y2) per segment, in reveal order
+        self.depths = np.zeros(0, dtype=np.uint8)
+        self.is_main = np.zeros(0, dtype=bool)
+        self.priority = np.zeros(0, dtype=np.intp)  # Segment indices, trunk first, finest branches last
         self.flash_opacity = 0
+        self.fade = 1.0
+        self.sprite = None  # StrikeSprite drawn instead of vector lines, if one was available
         self.hue_offset = random.uniform(0, 1)  # Color variation for lightning
         self.generate_strike_pattern()  # Create initial bolt structure
     
     def generate_strike_pattern(self):
         # Generate a random pattern of branches for the lightning bolt
-        self.branches = []
+        branches = []
         
         def recursive_branch(x, y, angle, length, depth, is_main_bolt=False):
             # Recursively create lightning branches based on depth and length
@@ -57,12 +85,7 @@ class LightningStrike:
                 end_y = max(10, min(410, end_y))
                 
                 # Add the segment to the list
-                segments.append({
-                    'start': (current_x, current_y),
-                    'end': (end_x, end_y),
-                    'depth': depth,
-                    'is_main': is_main_bolt
-                })
+                segments.append((current_x, current_y, end_x, end_y, depth, is_main_bolt))
                 
                 # Create branches from the main bolt if long enough
                 if is_main_bolt:
@@ -79,7 +102,7 @@ class LightningStrike:
                 current_x, current_y = end_x, end_y
                 jitter = random.uniform(-20, 20)
             
-            self.branches.extend(segments)
+            branches.extend(segments)
             
             # Add sub-branches for smaller segments if the length is sufficient
             if not is_main_bolt and depth > 1 and length > 25:
@@ -107,9 +130,19 @@ class LightningStrike:
         start_angle = base_angle + (self.lean_direction * random.uniform(5, 10))
         recursive_branch(start_x, 10, start_angle, self.max_length, 5, True)
 
-    def get_rgb_color(self, time_offset, saturation):
+        # Pack into arrays: one row per segment instead of a dict per segment
+        count = len(branches)
+        self.segments = np.array([branch[:4] for branch in branches], dtype=np.float32).reshape(count, 4)
+        self.depths = np.array([branch[4] for branch in branches], dtype=np.uint8)
+        self.is_main = np.array([branch[5] for branch in branches], dtype=bool)
+        self.priority = np.argsort(-(self.depths.astype(np.intp) + self.is_main * 10), kind='stable')
+
+    def get_rgb_color(self, time_offset, saturation, current_time, flicker):
+        return rgb(*self.get_rgb_values(time_offset, saturation, current_time, flicker))
+
+    def get_rgb_values(self, time_offset, saturation, current_time, flicker):
         # Generate dynamic RGB colors for the lightning bolt effect
-        t = (time.time() * 1.5 + time_offset + self.hue_offset) % 1  # Slow color cycle
+        t = (current_time * 1.5 + time_offset + self.hue_offset) % 1  # Slow color cycle
         
         # Calculate RGB values based on time offset
         if t < 1/6:
@@ -125,21 +158,31 @@ class LightningStrike:
         else:
             r, g, b = 1, 0, (6-t*6)
         
-        # Adjust brightness with random flickering
-        flicker = random.uniform(0.95, 1.05)
+        # Adjust brightness with flickering
         r = int(min(255, (r * saturation + (1 - saturation)) * 255 * flicker))
         g = int(min(255, (g * saturation + (1 - saturation)) * 255 * flicker))
         b = int(min(255, (b * saturation + (1 - saturation)) * 255 * flicker))
         
-        return rgb(r, g, b)
+        return r, g, b
+
+    def get_palette(self, current_time):
+        # Colors for one frame: the flash and each glow layer, with a single random flicker
+        flicker = random.uniform(0.95, 1.05)
+        flash = self.get_rgb_color(*FLASH_COLOR, current_time, flicker)
+        glow = [self.get_rgb_color(offset, saturation, current_time, flicker)
+                for offset, saturation, *_ in GLOW_LAYERS]
+        return flash, glow
 
-    def start(self, current_time):
-        # Activate the lightning animation
+    def start(self, current_time, sprite=None):
+        # Activate the lightning animation, with a pre-rendered sprite when one is available
         self.start_time = current_time
         self.active = True
         self.progress = 0.0
         self.flash_opacity = 0
-        self.generate_strike_pattern()  # Regenerate strike for every activation
+        self.fade = 1.0
+        self.sprite = sprite
+        if sprite is None:
+            self.generate_strike_pattern()  # Regenerate strike for every activation
 
     def update(self, current_time):
         # Update animation progress and flash effect
@@ -159,39 +202,68 @@ class LightningStrike:
             t = elapsed / strike_duration
             self.progress = 1 - (1 - t) * (1 - t)  # Smooth strike animation
             self.flash_opacity = 0
+            self.fade = 1.0
         else:
             self.progress = 1
             flash_elapsed = elapsed - strike_duration
             flash_t = flash_elapsed / flash_duration
             
             flash_progress = 1 - flash_t
+            self.fade = flash_progress
             self.flash_opacity = int(15 * flash_progress * (1 + math.sin(flash_progress * 10)))
 
-    def draw(self):
-        # Render the lightning bolt and its glow effect
+    def shape_count(self):
+        # Shapes a full-detail draw of the current frame would use
         if not self.active:
-            return
+            return 0
+        if self.sprite is not None:
+            return (self.progress > 0) + (self.flash_opacity > 0)
+        visible = max(0, int(len(self.segments) * self.progress))  # Progress is negative before a delayed start
+        return visible * (len(GLOW_LAYERS) + 1) + (self.flash_opacity > 0)
+
+    def draw(self, shape_budget=None):
+        """
+        Render the lightning bolt and its glow effect within a shape budget. Glow layers are
+        dropped first (outermost first), then the finest branches. Returns the shapes drawn.
+        """
+        if not self.active:
+            return 0
+
+        flash_color, glow_colors = self.get_palette(time.time())
+        shapes = 0
 
         # Render screen-wide flash
         if self.flash_opacity > 0:
-            flash_color = self.get_rgb_color(0.8, 0.6)
             drawRect(0, 0, 650, 450, fill=flash_color, opacity=self.flash_opacity)
+            shapes += 1
+
+        if self.sprite is not None:
+            return shapes + self.sprite.draw(self.progress, self.fade)
 
         # Calculate visible branches based on progress
-        total_branches = len(self.branches)
-        visible_branches = int(total_branches * self.progress)
-        
+        total_branches = len(self.segments)
+        visible_branches = max(0, int(total_branches * self.progress))
+        if visible_branches == 0:
+            return shapes
+
+        # Level of detail: as many glow layers as the budget allows, then fewer segments
+        indices = np.arange(visible_branches)
+        glow_layers = len(GLOW_LAYERS)
+        if shape_budget is not None:
+            available = max(0, shape_budget - shapes)
+            glow_layers = max(0, min(glow_layers, available // visible_branches - 1))
+            if available < visible_branches:
+                priority = self.priority[self.priority < visible_branches]
+                indices = np.sort(priority[:available])
+        layers = list(zip(GLOW_LAYERS, glow_colors))[len(GLOW_LAYERS) - glow_layers:]
+
         # Render each visible branch with progressive animation
-        for i, branch in enumerate(self.branches[:visible_branches]):
+        segments = self.segments[indices].tolist()
+        depths = self.depths[indices].tolist()
+        is_main = self.is_main[indices].tolist()
+        for i, (start_x, start_y, end_x, end_y), depth, main in zip(indices.tolist(), segments, depths, is_main):
             branch_progress = min(1.0, (visible_branches - i) / 2)
-            if branch_progress <= 0:
-                continue
 
-            start_x, start_y = branch['start']
-            end_x, end_y = branch['end']
-            depth = branch['depth']
-            is_main = branch['is_main']
-            
             # Calculate the current end position based on animation progress
             current_end_x = start_x + (end_x - start_x) * branch_progress
             current_end_y = start_y + (end_y - start_y) * branch_progress
@@ -199,34 +271,122 @@ class LightningStrike:
             self.draw_lightning_segment(
                 start_x, start_y,
                 current_end_x, current_end_y,
-                depth, branch_progress, is_main
+                depth, branch_progress, main, layers
             )
+        return shapes + len(segments) * (len(layers) + 1)
 
-    def draw_lightning_segment(self, x1, y1, x2, y2, depth, intensity, is_main):
-        # Draw multi-layered glow and white core for each lightning segment
+    def draw_lightning_segment(self, x1, y1, x2, y2, depth, intensity, is_main, layers):
+        # Draw the given glow layers and the white core for one lightning segment
         max_glow = 10 if is_main else 7
         
-        # Outer glow layer
-        opacity = int(15 * intensity)
-        color = self.get_rgb_color(0.2, 0.7)
-        glow_width = max_glow * (1.2 if is_main else 0.9)
-        drawLine(x1, y1, x2, y2, fill=color, opacity=opacity, lineWidth=glow_width)
-        
-        # Middle glow layer
-        opacity = int(20 * intensity)
-        color = self.get_rgb_color(0.4, 0.8)
-        glow_width = (max_glow-3) * (0.8 if is_main else 0.6)
-        drawLine(x1, y1, x2, y2, fill=color, opacity=opacity, lineWidth=glow_width)
-        
-        # Inner glow layer
-        opacity = int(25 * intensity)
-        color = self.get_rgb_color(0.6, 0.9)
-        glow_width = (max_glow-6) * (0.6 if is_main else 0.4)
-        drawLine(x1, y1, x2, y2, fill=color, opacity=opacity, lineWidth=glow_width)
+        for (_, _, opacity, main_width, branch_width, reduction), color in layers:
+            glow_width = (max_glow - reduction) * (main_width if is_main else branch_width)
+            drawLine(x1, y1, x2, y2, fill=color, opacity=int(opacity * intensity), lineWidth=glow_width)
         
         # White core of the bolt
         drawLine(x1, y1, x2, y2, fill='white', lineWidth=2 if is_main else 1)
 
+# One strike pattern pre-rendered with its glow at each reveal stage
+class StrikeSprite:
+    def __init__(self, stages):
+        self.stages = stages  # (image, left, top) per reveal stage, or None if nothing is visible yet
+
+    def draw(self, progress, fade):
+        # Draw the reveal stage for progress in (0, 1], fading out with the flash. Returns shapes drawn.
+        if progress <= 0:
+            return 0
+        stage = self.stages[min(len(self.stages) - 1, math.ceil(progress * len(self.stages)) - 1)]
+        if stage is None:
+            return 0
+        image, left, top = stage
+        drawImage(image, left, top, opacity=int(100 * (0.4 + 0.6 * fade)))
+        return 1
+
+def render_strike_sprite(strike, stages=SPRITE_STAGES):
+    """
+    Rasterize a strike's pattern into RGBA images, one per reveal stage, using the same glow
+    layers, widths and reveal rule as the vector drawing. Colors are taken at a random point
+    of the hue cycle, since a sprite cannot cycle hue while it is shown.
+    """
+    hue_time = random.uniform(0, 1)
+    colors = [strike.get_rgb_values(offset, saturation, hue_time, 1.0) for offset, saturation, *_ in GLOW_LAYERS]
+    if len(strike.segments) == 0:
+        return StrikeSprite([None] * stages)
+
+    # Render on a canvas just around the pattern rather than the whole screen
+    left = int(strike.segments[:, 0::2].min()) - SPRITE_PADDING
+    top = int(strike.segments[:, 1::2].min()) - SPRITE_PADDING
+    canvas = (int(strike.segments[:, 0::2].max()) + SPRITE_PADDING - left,
+              int(strike.segments[:, 1::2].max()) + SPRITE_PADDING - top)
+    segments = (strike.segments - (left, top, left, top)).tolist()
+    is_main = strike.is_main.tolist()
+
+    rendered = []
+    for stage in range(1, stages + 1):
+        visible = int(len(segments) * stage / stages)
+        if visible == 0:
+            rendered.append(None)
+            continue
+
+        lines = []
+        for i in range(visible):
+            x1, y1, x2, y2 = segments[i]
+            intensity = min(1.0, (visible - i) / 2)
+            lines.append(((x1, y1, x1 + (x2 - x1) * intensity, y1 + (y2 - y1) * intensity), intensity, is_main[i]))
+
+        image = Image.new('RGBA', canvas, (0, 0, 0, 0))
+        for (_, _, opacity, main_width, branch_width, reduction), color in zip(GLOW_LAYERS, colors):
+            layer = Image.new('RGBA', canvas, (0, 0, 0, 0))
+            draw = ImageDraw.Draw(layer)
+            for points, intensity, main in lines:
+                max_glow = 10 if main else 7
+                width = (max_glow - reduction) * (main_width if main else branch_width)
+                draw.line(points, fill=color + (int(opacity * intensity * 2.55),), width=max(1, round(width)))
+            image.alpha_composite(layer.filter(ImageFilter.GaussianBlur(1)))
+
+        draw = ImageDraw.Draw(image)
+        for points, _, main in lines:
+            draw.line(points, fill=(255, 255, 255, 255), width=2 if main else 1)
+
+        bbox = image.getbbox()
+        rendered.append((CMUImage(image.crop(bbox)), left + bbox[0], top + bbox[1]) if bbox else None)
+    return StrikeSprite(rendered)
+
+# Pool of pre-rendered sprites per strike, built in the background. Each trigger takes one
+# sprite per strike and queues a replacement, so the pool refills lazily and patterns vary.
+class StrikeSpritePool:
+    def __init__(self, strikes, pool_size=SPRITE_POOL_SIZE):
+        # (x, y, max_length, duration, lean_direction) for each strike, used to build new patterns
+        self.templates = [(s.x, s.y, s.max_length, s.duration, s.lean_direction) for s in strikes]
+        self.ready = [deque() for _ in strikes]
+        self.jobs = queue.Queue()
+        for _ in range(pool_size):
+            for index in range(len(strikes)):
+                self.jobs.put(index)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while True:
+            index = self.jobs.get()
+            try:
+                sprite = render_strike_sprite(LightningStrike(*self.templates[index]))
+            except Exception as e:
+                print(f"Lightning sprite rendering failed: {e}")
+                continue
+            self.ready[index].append(sprite)
+
+    def take(self, index):
+        # A ready sprite for strike index, or None (draw vectors) if the pool has run dry
+        try:
+            sprite = self.ready[index].popleft()
+        except IndexError:
+            return None
+        self.jobs.put(index)
+        return sprite
+
 # Initialize multiple lightning bolts with different properties
 def init_fissure(app):
     app.fissures = [
@@ -238,18 +398,30 @@ def init_fissure(app):
         LightningStrike(app.width * 0.6, 0, max_length=app.height * 0.4, duration=0.5, lean_direction=-1),
     ]
     app.strike_delays = [0, 0.3, 0.06, 0.09, 0.12, 0.15]
+    app.fissure_shape_budget = DEFAULT_SHAPE_BUDGET
+    app.fissure_sprites = StrikeSpritePool(app.fissures)
+    app.fissure_sprites.start()
 
 # Trigger all lightning bolts with staggered start times
 def trigger_fissure(app, current_time):
     for i, fissure in enumerate(app.fissures):
-        fissure.start(current_time + app.strike_delays[i])
+        fissure.start(current_time + app.strike_delays[i], app.fissure_sprites.take(i))
 
 # Update the animation state of all active lightning bolts
 def update_fissure(app, current_time):
     for fissure in app.fissures:
         fissure.update(current_time)
 
-# Render all active lightning bolts
+# Render all active lightning bolts, sharing the shape budget in proportion to full detail.
+# Returns the number of shapes drawn.
 def draw_fissure(app):
+    wanted = sum(fissure.shape_count() for fissure in app.fissures)
+    if wanted == 0:
+        return 0
+    budget = app.fissure_shape_budget
+    shapes = 0
     for fissure in app.fissures:
-        fissure.draw()
\ No newline at end of file
+        share = fissure.shape_count()
+        if share:
+            shapes += fissure.draw(share if wanted <= budget else budget * share // wanted)
+    return shapes
\ No newline at end of file
@@ -0,0 +1,23 @@
+import os
+import sys
+import pytest
+
+# The app's modules live in src/ and import each other by name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+def makeRandomShots(rng, count, makeRate=0.5, zones=(None,)):
+    """
+    count random shots as [shotNum, made, timestamp, zone] lists, with non-decreasing
+    timestamps (equal ones happen too) and zones drawn from zones.
+    """
+    shots = []
+    timestamp = 1000.0
+    for shotNumber in range(1, count + 1):
+        timestamp += rng.choice([0.0, rng.uniform(1, 30)])
+        shots.append([shotNumber, rng.random() < makeRate, timestamp, rng.choice(zones)])
+    return shots
+
+@pytest.fixture
+def randomShots():
+    # Shared random shot-history generator, called as randomShots(rng, count, ...)
+    return makeRandomShots
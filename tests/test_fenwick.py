@@ -0,0 +1,30 @@
+import random
+import pytest
+from fenwick import FenwickTree
+
+# FenwickTree sums must match plain list sums under random appends and updates.
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_plain_sums(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        values = [rng.randint(0, 1) for _ in range(rng.randint(0, 100))]
+        tree = FenwickTree(values)
+        for _ in range(rng.randint(0, 100)):
+            if values and rng.random() < 0.5:
+                index = rng.randrange(len(values))
+                values[index] = rng.randint(0, 1)
+                tree.set(index, values[index])
+            else:
+                values.append(rng.randint(0, 1))
+                tree.append(values[-1])
+            start = rng.randint(0, len(values))
+            end = rng.randint(0, len(values))
+            assert tree.sum(start, end) == sum(values[start:end])
+            assert tree.prefix(end) == sum(values[:end])
+
+def test_empty_tree():
+    tree = FenwickTree()
+    assert len(tree) == 0
+    assert tree.prefix(5) == 0
+    assert tree.sum(0, 5) == 0
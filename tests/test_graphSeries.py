@@ -0,0 +1,42 @@
+import random
+import numpy as np
+import pytest
+from graphSeries import GraphProjection, downsampleIndices
+from shotHistory import ShotHistory
+
+# Graph projection hit-testing, checked against a linear scan of the drawn points.
+
+def denseHistory(rng, count, minutes):
+    # Many shots packed into a short session, so most pixel columns hold several of them
+    history = ShotHistory()
+    for shotNumber, timestamp in enumerate(sorted(rng.uniform(0, minutes * 60) for _ in range(count)), 1):
+        history.append((shotNumber, rng.random() < 0.5, timestamp, None))
+    return history
+
+def linearHitTest(projection, x, y, radius):
+    for index in projection.drawn.tolist():
+        if (x - projection.xs[index])**2 + (y - projection.ys[index])**2 <= radius**2:
+            return index
+    return None
+
+@pytest.mark.parametrize('seed', range(3))
+def test_hit_test_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    projection = GraphProjection()
+    projection.update(denseHistory(rng, 5000, 3), 0, 3, 100, 115, 325, 280)
+    for _ in range(2000):
+        x, y = rng.uniform(90, 435), rng.uniform(105, 405)
+        assert projection.hitTest(x, y) == linearHitTest(projection, x, y, 10)
+
+def test_drawn_points_per_column_are_bounded():
+    rng = random.Random(0)
+    xs = np.sort(np.array([rng.uniform(0, 50) for _ in range(10000)]))
+    ys = np.array([rng.uniform(0, 100) for _ in range(10000)])
+    drawn = downsampleIndices(xs, ys, 50)
+    columns = np.minimum((xs[drawn] - xs[0]) / (xs[-1] - xs[0]) * 50, 49).astype(int)
+    assert np.bincount(columns).max() <= 4
+
+def test_hit_test_on_empty_projection():
+    projection = GraphProjection()
+    projection.update(ShotHistory(), 0, 3, 100, 115, 325, 280)
+    assert projection.hitTest(200, 200) is None
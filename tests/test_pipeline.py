@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+
+import objectDetection
+from frameChannel import FrameChannel, BLOCK
+from pipeline import DetectionPipeline
+
+# Runs the threaded pipeline end to end on the bundled test video with a fake detector, so
+# a broken inference path shows up as missing detections rather than a printed warning.
+
+testVideo = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test1.mp4')
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+class FakeBoxes:
+    def __init__(self, array):
+        self.data = FakeTensor(array)
+
+class FakeResult:
+    def __init__(self, array):
+        self.boxes = FakeBoxes(array)
+
+class FakeDetector:
+    # A ball and a rim on every frame, in model-input coordinates
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, frames, **kwargs):
+        self.calls += 1
+        data = np.array([[100, 100, 140, 140, 0.9, objectDetection.BALL],
+                         [300, 80, 380, 120, 0.9, objectDetection.RIM]], dtype=np.float32)
+        return [FakeResult(data) for _ in frames]
+
+@pytest.mark.parametrize('batchSize', [1, 4])
+def test_thread_workers_produce_detections(monkeypatch, batchSize):
+    detector = FakeDetector()
+    monkeypatch.setattr(objectDetection, 'waitForModel', lambda: detector)
+    monkeypatch.setattr(objectDetection, 'loadModel', lambda *args, **kwargs: detector)
+
+    output = FrameChannel(64, BLOCK)
+    pipeline = DetectionPipeline(testVideo, 540, 265, output, numWorkers=2, workerMode='thread',
+                                 batchSize=batchSize, closeOutput=True)
+    assert pipeline.start()
+
+    results = []
+    while len(results) < 20:
+        result = output.get(block=True, timeout=10)
+        assert result is not None
+        results.append(result)
+    pipeline.stop()
+    pipeline.join(timeout=5)
+
+    assert detector.calls > 0
+    for result in results:
+        assert len(result.detections) == 2
+        assert result.ballDetected and result.rimDetected
+        assert not result.shotMadeDetected
@@ -0,0 +1,102 @@
+import random
+import pytest
+from shotHistory import ShotHistory
+
+# ShotHistory range queries and corrections, checked against plain sums over a list of shots.
+
+@pytest.fixture
+def randomHistory(randomShots):
+    # A ShotHistory and the same shots as a list of [shotNum, made, timestamp, zone]
+    def build(rng, count):
+        shots = randomShots(rng, count, zones=(None, '1', '4', '8'))
+        history = ShotHistory(capacity=4)
+        for shot in shots:
+            history.append(tuple(shot))
+        return history, shots
+    return build
+
+def zoneTotals(shots, zone):
+    inZone = [shot for shot in shots if shot[3] == zone]
+    return sum(shot[1] for shot in inZone), len(inZone)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_makes_and_attempts_match_slices(seed, randomHistory):
+    rng = random.Random(seed)
+    history, shots = randomHistory(rng, 50)
+    made = [shot[1] for shot in shots]
+    bounds = list(range(-60, 61)) + [None]
+    for _ in range(500):
+        start, end = rng.choice(bounds), rng.choice(bounds)
+        assert history.makes(start, end) == sum(made[start:end])
+        assert history.attempts(start, end) == len(made[start:end])
+
+def test_range_bounds_past_either_end(randomHistory):
+    history, shots = randomHistory(random.Random(0), 10)
+    makes = sum(shot[1] for shot in shots)
+    assert history.makes(-100, 100) == makes
+    assert history.attempts(-100, 100) == 10
+    assert history.makes(20, 30) == 0
+    assert history.attempts(20, 30) == 0
+    assert history.rangePercentage(20, 30) == 0.0
+    assert history.makes(5, 2) == 0
+
+@pytest.mark.parametrize('seed', range(4))
+def test_set_made_updates_every_running_total(seed, randomHistory):
+    rng = random.Random(seed)
+    history, shots = randomHistory(rng, 40)
+    for _ in range(100):
+        index = rng.randrange(-40, 40)
+        made = rng.random() < 0.5
+        version = history.version
+        changed = shots[index][1] != made
+        history.setMade(index, made)
+        shots[index][1] = made
+        assert history.version == version + changed
+
+        assert list(history) == [tuple(shot) for shot in shots]
+        assert history.makes() == sum(shot[1] for shot in shots)
+        cumulative = 0
+        for i, shot in enumerate(shots):
+            cumulative += shot[1]
+            assert history.cumulativeMakes[i] == cumulative
+            assert history.percentage(i) == pytest.approx(cumulative / (i + 1) * 100)
+        for zone in '148':
+            assert history.zoneStats(zone) == zoneTotals(shots, zone)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_set_zone_moves_zone_totals(seed, randomHistory):
+    rng = random.Random(seed)
+    history, shots = randomHistory(rng, 40)
+    for _ in range(100):
+        index = rng.randrange(-40, 40)
+        zone = rng.choice([None, '1', '4', '8'])
+        history.setZone(index, zone)
+        shots[index][3] = zone
+        assert history[index] == tuple(shots[index])
+        for zone in '148':
+            assert history.zoneStats(zone) == zoneTotals(shots, zone)
+
+def test_corrections_reject_out_of_range_indices(randomHistory):
+    history, _ = randomHistory(random.Random(0), 5)
+    with pytest.raises(IndexError):
+        history.setMade(5, True)
+    with pytest.raises(IndexError):
+        history.setZone(-6, '1')
+
+@pytest.mark.parametrize('seed', range(4))
+def test_time_range_matches_filter(seed, randomHistory):
+    rng = random.Random(seed)
+    history, shots = randomHistory(rng, 50)
+    first, last = shots[0][2], shots[-1][2]
+    for _ in range(300):
+        startTime = rng.uniform(first - 100, last + 100)
+        endTime = startTime + rng.uniform(-50, 300)
+        if rng.random() < 0.2:
+            startTime = rng.choice(shots)[2]  # Exactly on a shot
+        start, end = history.timeRange(startTime, endTime)
+        inRange = [shot[0] for shot in shots if startTime <= shot[2] < endTime]
+        assert [shot[0] for shot in history[start:end]] == inRange
+        assert history.makes(start, end) == sum(shot[1] for shot in shots if startTime <= shot[2] < endTime)
+
+def test_time_range_of_empty_history():
+    assert ShotHistory().timeRange(0, 100) == (0, 0)
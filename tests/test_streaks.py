@@ -0,0 +1,155 @@
+import random
+import pytest
+from streaks import StreakAnalyzer
+
+# StreakAnalyzer must give the same hot/cold periods as a full rescan of the shot history,
+# after every shot and for every window size.
+
+def findStreakPeriodsByScan(shotHistory, window_size=5):
+    """
+    Reference implementation, the full rescan the app used before StreakAnalyzer: rescan a
+    list of (shotNum, made, timestamp, zone) shots.
+    """
+    if len(shotHistory) < 3:
+        return None, None
+
+    best_hot_period = None
+    best_cold_period = None
+    max_hot_percentage = 0
+    min_cold_percentage = 100
+
+    current_streak = []
+    longest_make_streak = []
+    longest_miss_streak = []
+
+    # Analyze shots for rolling windows and longest streaks
+    for i, shot in enumerate(shotHistory):
+        shot_num, made, timestamp, location = shot
+
+        # Consecutive streak tracking
+        if not current_streak or current_streak[0][1] == made:
+            current_streak.append(shot)
+        else:
+            if current_streak[0][1]:
+                if len(current_streak) > len(longest_make_streak):
+                    longest_make_streak = current_streak.copy()
+            else:
+                if len(current_streak) > len(longest_miss_streak):
+                    longest_miss_streak = current_streak.copy()
+            current_streak = [shot]
+
+        # Rolling window analysis
+        if i >= window_size - 1:
+            window = shotHistory[i-window_size+1:i+1]
+            makes_in_window = sum(1 for _, m, _, _ in window if m)
+            percentage = (makes_in_window / window_size) * 100
+
+            # Update hot period
+            if percentage > max_hot_percentage and makes_in_window >= 3:
+                max_hot_percentage = percentage
+                best_hot_period = (
+                    window[0][2],
+                    window[-1][2],
+                    percentage,
+                    window_size,
+                    True,
+                    [shot[0] for shot in window]
+                )
+
+            # Update cold period
+            if percentage < min_cold_percentage and (window_size - makes_in_window) >= 3:
+                min_cold_percentage = percentage
+                best_cold_period = (
+                    window[0][2],
+                    window[-1][2],
+                    percentage,
+                    window_size,
+                    False,
+                    [shot[0] for shot in window]
+                )
+
+    # Check final streak
+    if current_streak:
+        if current_streak[0][1]:
+            if len(current_streak) > len(longest_make_streak):
+                longest_make_streak = current_streak
+        else:
+            if len(current_streak) > len(longest_miss_streak):
+                longest_miss_streak = current_streak
+
+    hot_period = None
+    cold_period = None
+
+    # Determine final hot period
+    if longest_make_streak and len(longest_make_streak) >= 3:
+        consecutive_hot = (
+            longest_make_streak[0][2],
+            longest_make_streak[-1][2],
+            100.0,
+            len(longest_make_streak),
+            True,
+            [shot[0] for shot in longest_make_streak]
+        )
+        hot_period = consecutive_hot if not best_hot_period else \
+            max([consecutive_hot, best_hot_period], key=lambda x: (x[2], x[3]))
+    else:
+        hot_period = best_hot_period
+
+    # Determine final cold period
+    if longest_miss_streak and len(longest_miss_streak) >= 3:
+        consecutive_cold = (
+            longest_miss_streak[0][2],
+            longest_miss_streak[-1][2],
+            0.0,
+            len(longest_miss_streak),
+            False,
+            [shot[0] for shot in longest_miss_streak]
+        )
+        cold_period = consecutive_cold if not best_cold_period else \
+            min([consecutive_cold, best_cold_period], key=lambda x: (x[2], -x[3]))
+    else:
+        cold_period = best_cold_period
+
+    return hot_period, cold_period
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_full_rescan_after_every_shot(seed, randomShots):
+    rng = random.Random(seed)
+    windowSizes = (3, 5, 8)
+    for _ in range(500):
+        analyzer = StreakAnalyzer(windowSizes)
+        history = []
+        for shot in randomShots(rng, rng.randint(0, 60), makeRate=rng.random()):
+            history.append(shot)
+            analyzer.add(*shot[:3])
+            for size in windowSizes:
+                assert analyzer.periods(size) == findStreakPeriodsByScan(history, size)
+
+def test_fewer_than_three_shots_has_no_periods():
+    analyzer = StreakAnalyzer()
+    analyzer.add(1, True, 1000.0)
+    analyzer.add(2, True, 1001.0)
+    assert analyzer.periods() == (None, None)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_make_streaks_match_live_counters(seed, randomShots):
+    # The current and best streaks main.py's updateStreak keeps shot by shot
+    rng = random.Random(seed)
+    for _ in range(200):
+        analyzer = StreakAnalyzer()
+        currentStreak = bestStreak = 0
+        for shot in randomShots(rng, rng.randint(0, 60), makeRate=rng.random()):
+            analyzer.add(*shot[:3])
+            currentStreak = currentStreak + 1 if shot[1] else 0
+            bestStreak = max(bestStreak, currentStreak)
+            assert analyzer.makeStreaks() == (currentStreak, bestStreak)
+
+def test_from_history_matches_incremental(randomShots):
+    rng = random.Random(0)
+    history = randomShots(rng, 80)
+    analyzer = StreakAnalyzer()
+    for shot in history:
+        analyzer.add(*shot[:3])
+    rebuilt = StreakAnalyzer.fromHistory(history)
+    assert rebuilt.periods() == analyzer.periods()
+    assert rebuilt.makeStreaks() == analyzer.makeStreaks()